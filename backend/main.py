@@ -1,17 +1,36 @@
-from typing import List
+import os
+import secrets
+from typing import List, Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from backend.predict import get_metadata, predict
+from backend.pacing import pacer
+from backend.predict import get_metadata, predict, predict_many
+from backend.profiling import capture
 
 app = FastAPI()
 
+ADMIN_TOKEN = os.environ.get("AYSPI_ADMIN_TOKEN", "")
+
+
 class LandmarksRequest(BaseModel):
     landmarks: List[float]
 
 
+class BatchLandmarksRequest(BaseModel):
+    sequences: List[List[float]]
+    interpolate: bool = False
+
+
+class ProfileRequest(BaseModel):
+    max_requests: Optional[int] = None
+    max_seconds: Optional[float] = None
+    tf_trace: bool = False
+    top_n: int = 25
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -20,16 +39,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+def _require_admin(token: Optional[str]) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+
+
 @app.api_route("/health", methods=["GET", "HEAD"])
 def health():
     return {"status": "ok"}
 
 
 @app.post("/predict")
-def get_prediction(request: LandmarksRequest):
-    return predict(request.landmarks)
+def get_prediction(request: LandmarksRequest, x_client_id: Optional[str] = Header(None)):
+    started = pacer.begin()
+    try:
+        if capture.active:
+            result = capture.run(predict, request.landmarks)
+        else:
+            result = predict(request.landmarks)
+    finally:
+        pacer.end(started)
+
+    result["next_interval_ms"] = pacer.recommend(x_client_id, result)
+    return result
+
+
+@app.post("/predict_batch")
+def get_batch_prediction(request: BatchLandmarksRequest):
+    # Batch jobs count towards the load that paces webcam clients.
+    started = pacer.begin()
+    try:
+        if capture.active:
+            results = capture.run(predict_many, request.sequences, request.interpolate)
+        else:
+            results = predict_many(request.sequences, interpolate=request.interpolate)
+    finally:
+        pacer.end(started, windows=len(request.sequences))
+
+    return {"predictions": results}
 
 
 @app.get("/metadata")
 def metadata():
     return get_metadata()
+
+
+@app.post("/admin/profile")
+def start_profile(request: ProfileRequest, x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    try:
+        return capture.start(
+            max_requests=request.max_requests,
+            max_seconds=request.max_seconds,
+            tf_trace=request.tf_trace,
+            top_n=request.top_n,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+
+@app.get("/admin/profile")
+def profile_status(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    return capture.status()
+
+
+@app.delete("/admin/profile")
+def stop_profile(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    return capture.stop()
@@ -0,0 +1,129 @@
+import hashlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Hashes of the .keras model and scaler the weights were exported next to.
+SOURCE_KEYS = ("source_model_sha256", "source_scaler_sha256")
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0.0)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+_ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": _relu,
+    "softmax": _softmax,
+}
+
+
+def _conv1d_same(x: np.ndarray, kernel: np.ndarray, bias: np.ndarray) -> np.ndarray:
+    # Stack the k shifted views along channels and do a single matmul:
+    # (B, T, k*C_in) @ (k*C_in, C_out).
+    k = kernel.shape[0]
+    left = (k - 1) // 2
+    b, t, c = x.shape
+
+    padded = np.zeros((b, t + k - 1, c), dtype=x.dtype)
+    padded[:, left:left + t] = x
+    windows = np.concatenate([padded[:, i:i + t] for i in range(k)], axis=-1)
+
+    return windows @ kernel.reshape(k * c, -1) + bias
+
+
+def _gru(x: np.ndarray, kernel: np.ndarray, recurrent: np.ndarray, bias: np.ndarray) -> np.ndarray:
+    # Keras GRU with reset_after=True; gates are ordered z, r, h.
+    b, t, _ = x.shape
+    units = recurrent.shape[0]
+
+    x_proj = x @ kernel + bias[0]
+    h = np.zeros((b, units), dtype=x.dtype)
+    out = np.empty((b, t, units), dtype=x.dtype)
+
+    for step in range(t):
+        xz, xr, xh = np.split(x_proj[:, step], 3, axis=-1)
+        hz, hr, hh = np.split(h @ recurrent + bias[1], 3, axis=-1)
+
+        z = _sigmoid(xz + hz)
+        r = _sigmoid(xr + hr)
+        candidate = np.tanh(xh + r * hh)
+        h = z * h + (1.0 - z) * candidate
+        out[:, step] = h
+
+    return out
+
+
+def file_fingerprint(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_source_fingerprints(path: str) -> Dict[str, str]:
+    with np.load(path, allow_pickle=False) as data:
+        return {key: str(data[key]) for key in SOURCE_KEYS if key in data.files}
+
+
+class NumpySequenceClassifier:
+    # Forward pass of build_asl_sequence_classifier from weights written by
+    # training/export_numpy_model.py. Dropout is the identity at inference.
+
+    def __init__(self, layers: List[Tuple[str, Dict[str, np.ndarray]]]):
+        self.layers = layers
+
+    @classmethod
+    def load(cls, path: str) -> "NumpySequenceClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            layer_types = [str(t) for t in data["layer_types"]]
+            layers = []
+            for i, layer_type in enumerate(layer_types):
+                prefix = f"{i}/"
+                params = {
+                    key[len(prefix):]: data[key]
+                    for key in data.files
+                    if key.startswith(prefix)
+                }
+                layers.append((layer_type, params))
+
+        folded = []
+        for layer_type, params in layers:
+            if layer_type == "batch_norm":
+                scale = params["gamma"] / np.sqrt(params["moving_variance"] + params["epsilon"])
+                shift = params["beta"] - params["moving_mean"] * scale
+                params = {"scale": scale.astype(np.float32), "shift": shift.astype(np.float32)}
+            folded.append((layer_type, params))
+
+        return cls(folded)
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        x = np.asarray(batch, dtype=np.float32)
+
+        for layer_type, p in self.layers:
+            if layer_type == "conv1d":
+                x = _ACTIVATIONS[str(p["activation"])](_conv1d_same(x, p["kernel"], p["bias"]))
+            elif layer_type == "batch_norm":
+                x = x * p["scale"] + p["shift"]
+            elif layer_type == "bigru":
+                fwd = _gru(x, p["forward_kernel"], p["forward_recurrent_kernel"], p["forward_bias"])
+                bwd = _gru(x[:, ::-1], p["backward_kernel"], p["backward_recurrent_kernel"], p["backward_bias"])
+                x = np.concatenate([fwd, bwd[:, ::-1]], axis=-1)
+            elif layer_type == "global_avg_pool":
+                x = x.mean(axis=1)
+            elif layer_type == "dense":
+                x = _ACTIVATIONS[str(p["activation"])](x @ p["kernel"] + p["bias"])
+            else:
+                raise ValueError(f"Unsupported layer type in numpy weights: {layer_type}")
+
+        return x
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+BASE_INTERVAL_MS = 250
+MAX_INTERVAL_MS = 2000
+
+# Each in-flight request should have room to finish before the client sends again.
+LOAD_HEADROOM = 2.0
+LATENCY_SMOOTHING = 0.2
+
+# A client holding the same confident letter backs off gradually.
+STABLE_CONFIDENCE = 0.8
+STABLE_AFTER = 2
+STABLE_STEP = 0.5
+MAX_STABLE_FACTOR = 4.0
+
+MAX_TRACKED_CLIENTS = 10000
+
+
+class SendPacer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._latency_ms = 0.0
+        self._clients: "OrderedDict[str, list]" = OrderedDict()
+
+    def begin(self) -> float:
+        with self._lock:
+            self._inflight += 1
+        return time.perf_counter()
+
+    def end(self, started: float, windows: int = 1) -> None:
+        # Batch calls report per-window latency so one long job does not
+        # hold interactive clients at the cap after it has finished.
+        elapsed_ms = (time.perf_counter() - started) * 1000.0 / max(1, windows)
+        with self._lock:
+            self._inflight -= 1
+            if self._latency_ms == 0.0:
+                self._latency_ms = elapsed_ms
+            else:
+                self._latency_ms += LATENCY_SMOOTHING * (elapsed_ms - self._latency_ms)
+
+    def recommend(self, client_id: Optional[str], result: Dict[str, float | str]) -> int:
+        with self._lock:
+            load_ms = self._latency_ms * (1 + self._inflight) * LOAD_HEADROOM
+            stable_factor = 1.0
+            if client_id:
+                streak = self._update_streak(client_id, result)
+                stable_factor = min(
+                    MAX_STABLE_FACTOR,
+                    1.0 + max(0, streak - STABLE_AFTER) * STABLE_STEP,
+                )
+
+        interval = max(BASE_INTERVAL_MS * stable_factor, load_ms)
+        return int(min(MAX_INTERVAL_MS, interval))
+
+    def _update_streak(self, client_id: str, result: Dict[str, float | str]) -> int:
+        index = result.get("index")
+        confident = float(result.get("confidence", 0.0)) >= STABLE_CONFIDENCE
+
+        state = self._clients.pop(client_id, None)
+        if state is not None and confident and state[0] == index:
+            state[1] += 1
+        else:
+            state = [index if confident else None, 0]
+
+        self._clients[client_id] = state
+        if len(self._clients) > MAX_TRACKED_CLIENTS:
+            self._clients.popitem(last=False)
+
+        return state[1]
+
+
+pacer = SendPacer()
@@ -3,24 +3,36 @@ import os
 import re
 import sys
 import json
+import threading
 from typing import Dict, List
 
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
 
+import joblib
+import numpy as np
+
+from backend.numpy_engine import NumpySequenceClassifier, file_fingerprint, read_source_fingerprints
+from dataset.features import FeatureProjection
+from dataset.preprocessing import resample_or_pad, resample_or_pad_batch, wrist_relative
+
 _TF_NOISE = re.compile(
     r"Unable to register cu(?:DNN|BLAS) factory"
     r"|computation placer already registered"
 )
-_buf = io.StringIO()
-_old_stderr, sys.stderr = sys.stderr, _buf
-import tensorflow as tf
-sys.stderr = _old_stderr
-for _line in _buf.getvalue().splitlines():
-    if not _TF_NOISE.search(_line):
-        print(_line, file=sys.stderr)
 
-import joblib
-import numpy as np
+
+def _import_tensorflow():
+    # TensorFlow is only imported for the Keras engine.
+    buf = io.StringIO()
+    old_stderr, sys.stderr = sys.stderr, buf
+    try:
+        import tensorflow as tf
+    finally:
+        sys.stderr = old_stderr
+    for line in buf.getvalue().splitlines():
+        if not _TF_NOISE.search(line):
+            print(line, file=sys.stderr)
+    return tf
 
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -47,46 +59,78 @@ def _load_metadata() -> Dict[str, int | str]:
 
 _meta = _load_metadata()
 SEQ_LEN = int(_meta["seq_len"])
+FRAME_STRIDE = int(_meta.get("frame_stride", 1))
 FEATURES_PER_FRAME = int(_meta["features_per_frame"])
+MODEL_FEATURES = int(_meta.get("model_features", FEATURES_PER_FRAME))
 
 MODEL_PATH = os.path.join(MODELS_DIR, _meta.get("model_path", "asl_sequence_classifier.keras"))
 SCALER_PATH = os.path.join(MODELS_DIR, _meta.get("scaler_path", "scaler.pkl"))
 
-if not os.path.exists(MODEL_PATH):
+MAX_BATCH_SIZE = int(os.environ.get("AYSPI_MAX_BATCH_SIZE", "256"))
+
+NUMPY_WEIGHTS_PATH = os.path.join(
+    MODELS_DIR, _meta.get("numpy_weights_path", "asl_sequence_classifier.npz")
+)
+ENGINE = os.environ.get("AYSPI_ENGINE", "keras")
+
+# "local" runs the model in this process; "shm" hands windows to the
+# backend.shm_inference server process and loads no model here.
+INFERENCE_MODE = os.environ.get("AYSPI_INFERENCE", "local")
+
+if INFERENCE_MODE not in ("local", "shm"):
+    raise ValueError(f"Unknown AYSPI_INFERENCE: {INFERENCE_MODE!r} (expected 'local' or 'shm')")
+
+if INFERENCE_MODE == "local" and ENGINE == "keras" and not os.path.exists(MODEL_PATH):
     raise FileNotFoundError(f"Model not found: {MODEL_PATH}")
 
-if not os.path.exists(SCALER_PATH):
+if INFERENCE_MODE == "local" and not os.path.exists(SCALER_PATH):
     raise FileNotFoundError(f"Scaler not found: {SCALER_PATH}")
 
-for _gpu in tf.config.experimental.list_physical_devices('GPU'):
-    tf.config.experimental.set_memory_growth(_gpu, True)
 
-model = tf.keras.models.load_model(MODEL_PATH, compile=False)
-scaler = joblib.load(SCALER_PATH)
+def _check_numpy_weights_source():
+    # Retraining rewrites the model and scaler; stale weights would pair
+    # the old network with the new scaler.
+    source = read_source_fingerprints(NUMPY_WEIGHTS_PATH)
+    checks = [("source_scaler_sha256", SCALER_PATH)]
+    if os.path.exists(MODEL_PATH):
+        # Serving images may ship only the .npz and the scaler.
+        checks.append(("source_model_sha256", MODEL_PATH))
 
+    for key, path in checks:
+        if source.get(key) != file_fingerprint(path):
+            raise RuntimeError(
+                f"{NUMPY_WEIGHTS_PATH} was not exported from the current {os.path.basename(path)}. "
+                "Re-run training/export_numpy_model.py."
+            )
 
-def _resample_or_pad(seq: np.ndarray, target_frames: int) -> np.ndarray:
-    frames = seq.shape[0]
 
-    if frames == target_frames:
-        return seq
+def _load_model():
+    if ENGINE == "numpy":
+        if not os.path.exists(NUMPY_WEIGHTS_PATH):
+            raise FileNotFoundError(
+                f"NumPy weights not found: {NUMPY_WEIGHTS_PATH}. Run training/export_numpy_model.py."
+            )
+        _check_numpy_weights_source()
+        return NumpySequenceClassifier.load(NUMPY_WEIGHTS_PATH)
 
-    if frames < target_frames:
-        pad_count = target_frames - frames
-        pad = np.repeat(seq[-1][None, :], pad_count, axis=0)
-        return np.vstack([seq, pad])
+    if ENGINE != "keras":
+        raise ValueError(f"Unknown AYSPI_ENGINE: {ENGINE!r} (expected 'keras' or 'numpy')")
 
-    idx = np.linspace(0, frames - 1, target_frames).astype(int)
-    return seq[idx]
+    tf = _import_tensorflow()
+    for gpu in tf.config.experimental.list_physical_devices('GPU'):
+        tf.config.experimental.set_memory_growth(gpu, True)
 
+    keras_model = tf.keras.models.load_model(MODEL_PATH, compile=False)
+    return lambda batch: keras_model(batch, training=False).numpy()
 
-def _wrist_relative(seq: np.ndarray) -> np.ndarray:
-    seq_rel = seq.reshape(seq.shape[0], 21, 3)
-    seq_rel = seq_rel - seq_rel[:, 0:1, :]
-    return seq_rel.reshape(seq.shape[0], -1)
 
+if INFERENCE_MODE == "local":
+    model = _load_model()
+    scaler = joblib.load(SCALER_PATH)
+    projection = FeatureProjection.from_metadata(_meta, MODELS_DIR)
 
-def _prepare_sequence(landmarks: List[float]) -> np.ndarray:
+
+def _to_frames(landmarks: List[float]) -> np.ndarray:
     arr = np.array(landmarks, dtype=np.float32).reshape(-1)
 
     if arr.size % FEATURES_PER_FRAME != 0:
@@ -95,14 +139,55 @@ def _prepare_sequence(landmarks: List[float]) -> np.ndarray:
         )
 
     frames = arr.size // FEATURES_PER_FRAME
-    seq = arr.reshape(frames, FEATURES_PER_FRAME)
+    return arr.reshape(frames, FEATURES_PER_FRAME)
 
-    if frames != SEQ_LEN:
-        seq = _resample_or_pad(seq, SEQ_LEN)
+
+def _prepare_sequence(landmarks: List[float]) -> np.ndarray:
+    seq = _to_frames(landmarks)
+
+    if seq.shape[0] != SEQ_LEN:
+        seq = resample_or_pad(seq, SEQ_LEN)
 
     return seq
 
 
+def _infer_local(batch: np.ndarray) -> np.ndarray:
+    n = batch.shape[0]
+    # Batches are always freshly built from the request, so normalize in place.
+    batch = batch.reshape(n * SEQ_LEN, FEATURES_PER_FRAME)
+    batch = wrist_relative(batch, out=batch)
+    if not projection.is_identity:
+        batch = projection(batch)
+    batch_scaled = scaler.transform(batch)
+    batch_input = batch_scaled.reshape(n, SEQ_LEN, MODEL_FEATURES)
+    return model(batch_input)
+
+
+if INFERENCE_MODE == "shm":
+    # Imported here because it needs fcntl, which Windows does not have.
+    from backend.shm_inference import ShmInferenceClient
+
+    _infer = ShmInferenceClient(timeout_s=float(os.environ.get("AYSPI_SHM_TIMEOUT_S", "5")))
+    if (_infer.layout.seq_len, _infer.layout.features) != (SEQ_LEN, FEATURES_PER_FRAME):
+        raise RuntimeError(
+            f"Inference server expects ({_infer.layout.seq_len}, {_infer.layout.features}) windows, "
+            f"metadata says ({SEQ_LEN}, {FEATURES_PER_FRAME})."
+        )
+else:
+    _infer = _infer_local
+
+
+def _format_prediction(probs: np.ndarray) -> Dict[str, float | str]:
+    pred_index = int(np.argmax(probs))
+    pred_conf = float(probs[pred_index])
+
+    return {
+        "letter": index_to_letter.get(pred_index, "?"),
+        "confidence": pred_conf,
+        "index": pred_index,
+    }
+
+
 def predict(landmarks: List[float]) -> Dict[str, float | str]:
     if not landmarks:
         return {"error": "No landmarks provided."}
@@ -112,26 +197,71 @@ def predict(landmarks: List[float]) -> Dict[str, float | str]:
     except ValueError as exc:
         return {"error": str(exc)}
 
-    seq = _wrist_relative(seq)
+    try:
+        probs = _infer(seq[None, :, :])[0]
+    except (TimeoutError, ConnectionError) as exc:
+        # Only raised in shm mode, when the inference server is slow or down.
+        return {"error": str(exc)}
 
-    seq_flat = seq.reshape(SEQ_LEN, FEATURES_PER_FRAME)
-    seq_scaled = scaler.transform(seq_flat)
-    seq_input = seq_scaled.reshape(1, SEQ_LEN, FEATURES_PER_FRAME)
+    return _format_prediction(probs)
 
-    probs = model(seq_input, training=False).numpy()[0]
-    pred_index = int(np.argmax(probs))
-    pred_conf = float(np.max(probs))
 
-    return {
-        "letter": index_to_letter.get(pred_index, "?"),
-        "confidence": pred_conf,
-        "index": pred_index,
-    }
+_batch_buffers = threading.local()
+
+
+def _batch_buffer(n: int) -> np.ndarray:
+    # predict_many runs in FastAPI's thread pool and _infer_local normalizes
+    # the batch in place, so each thread keeps its own buffer, grown on demand
+    # up to MAX_BATCH_SIZE windows. Larger requests get a one-off array.
+    if n > MAX_BATCH_SIZE:
+        return np.empty((n, SEQ_LEN, FEATURES_PER_FRAME), dtype=np.float32)
+    buf = getattr(_batch_buffers, "buf", None)
+    if buf is None or buf.shape[0] < n:
+        buf = _batch_buffers.buf = np.empty((n, SEQ_LEN, FEATURES_PER_FRAME), dtype=np.float32)
+    return buf[:n]
+
+
+def predict_many(
+    sequences: List[List[float]], interpolate: bool = False
+) -> List[Dict[str, float | str]]:
+    results: List[Dict[str, float | str]] = [{} for _ in sequences]
+    valid_idx, valid_seqs = [], []
+
+    for i, landmarks in enumerate(sequences):
+        if not landmarks:
+            results[i] = {"error": "No landmarks provided."}
+            continue
+        try:
+            valid_seqs.append(_to_frames(landmarks))
+        except ValueError as exc:
+            results[i] = {"error": str(exc)}
+            continue
+        valid_idx.append(i)
+
+    if not valid_seqs:
+        return results
+
+    batch = resample_or_pad_batch(
+        valid_seqs, SEQ_LEN, interpolate=interpolate, out=_batch_buffer(len(valid_seqs))
+    )
+
+    try:
+        for start in range(0, len(valid_seqs), MAX_BATCH_SIZE):
+            probs = _infer(batch[start:start + MAX_BATCH_SIZE])
+            for i, p in zip(valid_idx[start:start + MAX_BATCH_SIZE], probs):
+                results[i] = _format_prediction(p)
+    except (TimeoutError, ConnectionError) as exc:
+        for i in valid_idx:
+            if not results[i]:
+                results[i] = {"error": str(exc)}
+
+    return results
 
 
 def get_metadata() -> Dict[str, int]:
     return {
         "seq_len": SEQ_LEN,
+        "frame_stride": FRAME_STRIDE,
         "features_per_frame": FEATURES_PER_FRAME,
         "num_classes": int(_meta.get("num_classes", 0)),
     }
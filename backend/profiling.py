@@ -0,0 +1,264 @@
+import cProfile
+import importlib.util
+import os
+import pstats
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_DIR = os.environ.get("AYSPI_PROFILE_DIR", os.path.join(PROJECT_ROOT, "profiles"))
+
+DEFAULT_TOP_N = 25
+
+
+class ProfileCapture:
+    # `active` is the only thing the request path reads while no capture is
+    # running, so leaving profiling off costs one attribute lookup per request.
+    # cProfile only hooks the calling thread, so each request thread gets its
+    # own profiler; they are merged when the capture finishes.
+
+    def __init__(self, output_dir: str = PROFILE_DIR):
+        self.output_dir = output_dir
+        self.active = False
+
+        self._lock = threading.Lock()
+        self._profilers: Optional[Dict[int, cProfile.Profile]] = None
+        self._in_flight = 0
+        self._remaining: Optional[int] = None
+        self._deadline: Optional[float] = None
+        self._tf_trace = False
+        self._top_n = DEFAULT_TOP_N
+        self._run_dir = ""
+        self._started_at = 0.0
+        self._requests = 0
+        self._timer: Optional[threading.Timer] = None
+        self._writing = False
+        self._last_summary: Optional[Dict[str, Any]] = None
+
+    def start(
+        self,
+        max_requests: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        tf_trace: bool = False,
+        top_n: int = DEFAULT_TOP_N,
+    ) -> Dict[str, Any]:
+        if max_requests is None and max_seconds is None:
+            raise ValueError("Set max_requests and/or max_seconds.")
+        if max_requests is not None and max_requests <= 0:
+            raise ValueError("max_requests must be positive.")
+        if max_seconds is not None and max_seconds <= 0:
+            raise ValueError("max_seconds must be positive.")
+        if tf_trace and importlib.util.find_spec("tensorflow") is None:
+            raise ValueError("tf_trace needs TensorFlow, which is not installed in this process.")
+
+        with self._lock:
+            if self.active or self._profilers is not None or self._writing:
+                raise RuntimeError("A profile capture is already running.")
+
+            self._started_at = time.time()
+            self._run_dir = _new_run_dir(self.output_dir, self._started_at)
+
+            self._profilers = {}
+            self._in_flight = 0
+            self._remaining = max_requests
+            self._deadline = None if max_seconds is None else self._started_at + max_seconds
+            self._tf_trace = tf_trace
+            self._top_n = top_n
+            self._requests = 0
+
+            if tf_trace:
+                _start_tf_trace(os.path.join(self._run_dir, "tf_trace"))
+
+            # Ends the capture even if no further request arrives.
+            if max_seconds is not None:
+                self._timer = threading.Timer(max_seconds, self.stop)
+                self._timer.daemon = True
+                self._timer.start()
+
+            self.active = True
+
+        return self.status()
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        profiler, finished = self._claim()
+        if finished is not None:
+            self._write(finished)
+        if profiler is None:
+            return fn(*args, **kwargs)
+
+        try:
+            return profiler.runcall(fn, *args, **kwargs)
+        finally:
+            self._release()
+
+    def _claim(self) -> Tuple[Optional[cProfile.Profile], Optional[Dict[str, Any]]]:
+        # Only the counters are under the lock; the profiled call itself
+        # runs concurrently with other requests.
+        with self._lock:
+            if not self.active:
+                return None, None
+
+            if self._expired():
+                return None, self._end()
+
+            if self._remaining is not None:
+                self._remaining -= 1
+                if self._remaining <= 0:
+                    self.active = False
+
+            self._in_flight += 1
+            thread_id = threading.get_ident()
+            profiler = self._profilers.get(thread_id)
+            if profiler is None:
+                profiler = self._profilers[thread_id] = cProfile.Profile()
+            return profiler, None
+
+    def _release(self) -> None:
+        finished = None
+        with self._lock:
+            self._in_flight -= 1
+            self._requests += 1
+            if not self.active:
+                finished = self._end()
+        if finished is not None:
+            self._write(finished)
+
+    def stop(self) -> Dict[str, Any]:
+        finished = None
+        with self._lock:
+            if self.active:
+                finished = self._end()
+        if finished is not None:
+            self._write(finished)
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        finished = None
+        with self._lock:
+            if self.active and self._expired():
+                finished = self._end()
+        if finished is not None:
+            self._write(finished)
+
+        with self._lock:
+
+            if self.active:
+                return {
+                    "active": True,
+                    "output_dir": self._run_dir,
+                    "requests_profiled": self._requests,
+                    "requests_remaining": self._remaining,
+                    "seconds_remaining": (
+                        None if self._deadline is None
+                        else max(0.0, self._deadline - time.time())
+                    ),
+                    "tf_trace": self._tf_trace,
+                }
+
+            return {
+                "active": False,
+                # Requests that started before the capture ended still finish profiling.
+                "finishing": self._profilers is not None or self._writing,
+                "last_capture": self._last_summary,
+            }
+
+    def _expired(self) -> bool:
+        return self._deadline is not None and time.time() >= self._deadline
+
+    def _end(self) -> Optional[Dict[str, Any]]:
+        # Caller holds _lock. Stops taking new requests; once in-flight ones
+        # finish, returns the capture for the caller to write outside the lock.
+        self.active = False
+        if self._in_flight or self._profilers is None:
+            return None
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        finished = {
+            "profilers": list(self._profilers.values()),
+            "run_dir": self._run_dir,
+            "tf_trace": self._tf_trace,
+            "top_n": self._top_n,
+            "requests": self._requests,
+            "started_at": self._started_at,
+        }
+        self._profilers = None
+        self._writing = True
+        return finished
+
+    def _write(self, finished: Dict[str, Any]) -> None:
+        # Merging and writing the stats can take a while, so it runs without
+        # _lock held and other requests are not blocked by it.
+        run_dir, top_n, requests = finished["run_dir"], finished["top_n"], finished["requests"]
+        summary: Dict[str, Any] = {"output_dir": run_dir, "error": "capture could not be written"}
+        try:
+            if finished["tf_trace"]:
+                _stop_tf_trace()
+
+            stats = pstats.Stats(*finished["profilers"])
+            stats_path = os.path.join(run_dir, "predict.prof")
+            stats.dump_stats(stats_path)
+
+            text_path = os.path.join(run_dir, "predict_top.txt")
+            with open(text_path, "w") as f:
+                if requests:
+                    stats.stream = f
+                    stats.sort_stats("cumulative").print_stats(top_n)
+
+            summary = {
+                "output_dir": run_dir,
+                "stats_path": stats_path,
+                "tf_trace_dir": os.path.join(run_dir, "tf_trace") if finished["tf_trace"] else None,
+                "requests_profiled": requests,
+                "duration_s": time.time() - finished["started_at"],
+                "top_functions": _top_functions(stats, top_n) if requests else [],
+            }
+        finally:
+            with self._lock:
+                self._last_summary = summary
+                self._writing = False
+
+
+def _new_run_dir(output_dir: str, started_at: float) -> str:
+    # Millisecond stamp plus a counter so back-to-back captures never share a directory.
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started_at))
+    base = os.path.join(output_dir, f"{stamp}-{int(started_at * 1000) % 1000:03d}")
+
+    run_dir, n = base, 1
+    while os.path.exists(run_dir):
+        n += 1
+        run_dir = f"{base}-{n}"
+    os.makedirs(run_dir)
+    return run_dir
+
+
+def _top_functions(stats: pstats.Stats, top_n: int) -> List[Dict[str, Any]]:
+    rows = []
+    for (filename, lineno, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{lineno}({name})",
+            "ncalls": ncalls,
+            "tottime_s": tottime,
+            "cumtime_s": cumtime,
+        })
+    rows.sort(key=lambda r: r["tottime_s"], reverse=True)
+    return rows[:top_n]
+
+
+def _start_tf_trace(logdir: str) -> None:
+    import tensorflow as tf
+
+    tf.profiler.experimental.start(logdir)
+
+
+def _stop_tf_trace() -> None:
+    import tensorflow as tf
+
+    tf.profiler.experimental.stop()
+
+
+capture = ProfileCapture()
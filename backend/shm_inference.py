@@ -0,0 +1,492 @@
+import os
+import sys
+import time
+import fcntl
+import select
+import signal
+import argparse
+import tempfile
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Tuple
+
+import numpy as np
+
+SHM_NAME = os.environ.get("AYSPI_SHM_NAME", "ayspi_inference")
+LOCK_DIR = os.environ.get("AYSPI_SHM_LOCK_DIR", tempfile.gettempdir())
+
+MAGIC = 0x41595350  # "AYSP"
+VERSION = 2
+HEADER_FIELDS = 8
+HEADER_BYTES = HEADER_FIELDS * 8
+# Header slot holding a per-start server id; zeroed when the server shuts down.
+EPOCH_FIELD = 7
+
+SLOT_FREE = 0
+SLOT_READY = 1
+SLOT_DONE = 2
+
+# Wakeups are best effort; waiters re-check this often in case one is lost.
+FALLBACK_POLL_S = 0.05
+
+
+def _align(n: int, to: int = 64) -> int:
+    return (n + to - 1) // to * to
+
+
+class RingLayout:
+    # One shared segment: [header][slot states][request ids][answered ids]
+    # [input windows][output probs]. Slots are split into one lane per HTTP
+    # worker so each lane has a single writer process. The client tags each
+    # request with an id and the server echoes it back with the result.
+
+    def __init__(self, lanes: int, slots_per_lane: int, seq_len: int, features: int, num_classes: int):
+        self.lanes = lanes
+        self.slots_per_lane = slots_per_lane
+        self.seq_len = seq_len
+        self.features = features
+        self.num_classes = num_classes
+
+        self.num_slots = lanes * slots_per_lane
+        self.state_offset = HEADER_BYTES
+        self.request_ids_offset = _align(self.state_offset + 4 * self.num_slots)
+        self.answered_ids_offset = _align(self.request_ids_offset + 8 * self.num_slots)
+        self.inputs_offset = _align(self.answered_ids_offset + 8 * self.num_slots)
+        self.outputs_offset = _align(self.inputs_offset + 4 * self.num_slots * seq_len * features)
+        self.size = _align(self.outputs_offset + 4 * self.num_slots * num_classes)
+
+    def header(self, epoch: int) -> np.ndarray:
+        return np.array(
+            [MAGIC, VERSION, self.lanes, self.slots_per_lane, self.seq_len, self.features, self.num_classes, epoch],
+            dtype=np.int64,
+        )
+
+    @classmethod
+    def from_header(cls, header: np.ndarray) -> "RingLayout":
+        if int(header[0]) != MAGIC:
+            raise RuntimeError("Shared memory segment is not an AYSPI inference ring.")
+        if int(header[1]) != VERSION:
+            raise RuntimeError(
+                f"Inference ring version {int(header[1])} does not match this worker ({VERSION}). "
+                "Restart the inference server and workers from the same checkout."
+            )
+        return cls(*(int(v) for v in header[2:7]))
+
+    def views(self, buf):
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=buf, offset=0)
+        states = np.ndarray((self.num_slots,), dtype=np.int32, buffer=buf, offset=self.state_offset)
+        request_ids = np.ndarray((self.num_slots,), dtype=np.int64, buffer=buf, offset=self.request_ids_offset)
+        answered_ids = np.ndarray((self.num_slots,), dtype=np.int64, buffer=buf, offset=self.answered_ids_offset)
+        inputs = np.ndarray(
+            (self.num_slots, self.seq_len, self.features),
+            dtype=np.float32, buffer=buf, offset=self.inputs_offset,
+        )
+        outputs = np.ndarray(
+            (self.num_slots, self.num_classes),
+            dtype=np.float32, buffer=buf, offset=self.outputs_offset,
+        )
+        return header, states, request_ids, answered_ids, inputs, outputs
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the segment with this
+        # process's resource tracker, which would unlink it on exit.
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _fifo_path(name: str, owner: str) -> str:
+    return os.path.join(LOCK_DIR, f"{name}.{owner}.fifo")
+
+
+def _open_listener(path: str) -> int:
+    # Opened read-write so the open never blocks and the FIFO never reports
+    # EOF while no one has the write end.
+    try:
+        os.mkfifo(path)
+    except FileExistsError:
+        pass
+    return os.open(path, os.O_RDWR | os.O_NONBLOCK)
+
+
+def _wait_for_ring(fd: int, timeout_s: float) -> bool:
+    readable, _, _ = select.select([fd], [], [], timeout_s)
+    if not readable:
+        return False
+    try:
+        while os.read(fd, 4096):
+            pass
+    except BlockingIOError:
+        pass
+    return True
+
+
+class _Bell:
+    # Write end of a FIFO another process waits on. Ringing never blocks:
+    # a full FIFO already has a wakeup pending, and with no listener the
+    # waiter falls back to polling.
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fd = None
+        self._lock = threading.Lock()
+
+    def ring(self) -> None:
+        with self._lock:
+            for _ in range(2):
+                if self.fd is None:
+                    try:
+                        self.fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+                    except OSError:
+                        # Missing FIFO, or ENXIO: nobody is listening yet.
+                        return
+                try:
+                    os.write(self.fd, b"\0")
+                    return
+                except BlockingIOError:
+                    return
+                except OSError:
+                    # The listener went away; reopen in case it was replaced.
+                    self.close()
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class _Attachment:
+    # One mapping of the server's segment. A restarted server creates a new
+    # segment under the same name, so the client swaps attachments.
+
+    def __init__(self, name: str):
+        try:
+            self.shm = _attach(name)
+        except FileNotFoundError:
+            raise ConnectionError(f"Inference server is not running (no shared memory '{name}').") from None
+
+        try:
+            header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+            self.layout = RingLayout.from_header(header)
+            self.epoch = int(header[EPOCH_FIELD])
+            del header
+        except RuntimeError:
+            self.shm.close()
+            raise
+
+        (self.header, self.states, self.request_ids, self.answered_ids,
+         self.inputs, self.outputs) = self.layout.views(self.shm.buf)
+
+        self.free: List[int] = []
+        # Slots whose request timed out while the server may still hold them.
+        self.abandoned: List[int] = []
+        self.users = 0
+        self.retired = False
+
+    @property
+    def server_stopped(self) -> bool:
+        return int(self.header[EPOCH_FIELD]) != self.epoch
+
+    def close(self) -> None:
+        del self.header, self.states, self.request_ids, self.answered_ids, self.inputs, self.outputs
+        self.shm.close()
+
+
+class ShmInferenceClient:
+    # Used by HTTP workers: writes (n, seq_len, 63) windows into this
+    # process's lane, rings the server and sleeps until the server rings
+    # the lane back. One listener thread per process waits on the lane's
+    # FIFO and wakes the request threads.
+
+    def __init__(self, name: str = SHM_NAME, timeout_s: float = 5.0, poll_s: float = FALLBACK_POLL_S):
+        self.name = name
+        self.timeout_s = timeout_s
+        self.poll_s = poll_s
+
+        self._cond = threading.Condition()
+        self._answered = threading.Condition()
+        self._lock_file = None
+        self._lane = -1
+        self._wake_fd = -1
+        self._next_id = 0
+        self._server_bell = _Bell(_fifo_path(name, "server"))
+
+        ring = _Attachment(name)
+        self._adopt(ring)
+        self._ring = ring
+
+        threading.Thread(target=self._listen, name="shm-inference-listener", daemon=True).start()
+
+    @property
+    def layout(self) -> RingLayout:
+        return self._ring.layout
+
+    def _claim_lane(self, lanes: int):
+        for lane in range(lanes):
+            f = open(os.path.join(LOCK_DIR, f"{self.name}.lane{lane}.lock"), "w")
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.close()
+                continue
+            return f, lane
+        raise RuntimeError(
+            f"All {lanes} inference lanes are taken. "
+            "Start the inference server with --lanes >= the number of HTTP workers."
+        )
+
+    def _adopt(self, ring: _Attachment) -> None:
+        # Keeps this worker's lane across restarts unless the new server has fewer lanes.
+        if self._lock_file is None or self._lane >= ring.layout.lanes:
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+            try:
+                self._lock_file, self._lane = self._claim_lane(ring.layout.lanes)
+            except RuntimeError:
+                ring.close()
+                raise
+            # The listener closes the previous lane's FIFO once it stops waiting on it.
+            self._wake_fd = _open_listener(_fifo_path(self.name, f"lane{self._lane}"))
+
+        first = self._lane * ring.layout.slots_per_lane
+        ring.free = list(range(first, first + ring.layout.slots_per_lane))
+        ring.states[ring.free] = SLOT_FREE
+
+    def _listen(self) -> None:
+        fd = self._wake_fd
+        while True:
+            if _wait_for_ring(fd, self.poll_s):
+                with self._answered:
+                    self._answered.notify_all()
+            if fd != self._wake_fd:
+                os.close(fd)
+                fd = self._wake_fd
+
+    def _reconnect(self) -> None:
+        # Caller holds _cond. Switches to the segment now registered under our
+        # name if it belongs to a different server start.
+        ring = _Attachment(self.name)
+        if ring.epoch in (0, self._ring.epoch):
+            ring.close()
+            if ring.epoch == 0:
+                raise ConnectionError("Inference server is shutting down.")
+            return
+
+        self._adopt(ring)
+        old, self._ring = self._ring, ring
+        old.retired = True
+        if old.users == 0:
+            old.close()
+
+    def _checkout(self) -> _Attachment:
+        with self._cond:
+            # A cleanly stopped server zeroes its epoch before unlinking.
+            if self._ring.server_stopped:
+                self._reconnect()
+            self._ring.users += 1
+            return self._ring
+
+    def _checkin(self, ring: _Attachment) -> None:
+        with self._cond:
+            ring.users -= 1
+            if ring.retired and ring.users == 0:
+                ring.close()
+
+    def _reclaim_abandoned(self, ring: _Attachment) -> None:
+        # Caller holds _cond. Only the server moves a slot out of READY,
+        # so a slot that is no longer READY is safe to reuse.
+        if not ring.abandoned:
+            return
+        released = [slot for slot in ring.abandoned if ring.states[slot] != SLOT_READY]
+        if released:
+            ring.abandoned = [slot for slot in ring.abandoned if slot not in released]
+            ring.states[released] = SLOT_FREE
+            ring.free.extend(released)
+
+    def _acquire(self, ring: _Attachment, count: int) -> Tuple[List[int], np.ndarray]:
+        deadline = time.monotonic() + self.timeout_s
+        with self._cond:
+            self._reclaim_abandoned(ring)
+            while not ring.free:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("No free inference slots.")
+                # Abandoned slots come back without a notify, so re-check periodically.
+                self._cond.wait(timeout=min(remaining, 0.01))
+                self._reclaim_abandoned(ring)
+            taken = ring.free[:count]
+            del ring.free[:count]
+
+            ids = np.arange(self._next_id + 1, self._next_id + 1 + len(taken), dtype=np.int64)
+            self._next_id += len(taken)
+            return taken, ids
+
+    def _release(self, ring: _Attachment, slots: List[int]) -> None:
+        ring.states[slots] = SLOT_FREE
+        with self._cond:
+            ring.free.extend(slots)
+            self._cond.notify_all()
+
+    def _abandon(self, ring: _Attachment, slots: List[int]) -> None:
+        with self._cond:
+            ring.abandoned.extend(slots)
+
+    def _submit(self, ring: _Attachment, slots: List[int], ids: np.ndarray, windows: np.ndarray) -> np.ndarray:
+        ring.inputs[slots] = windows
+        ring.request_ids[slots] = ids
+        ring.states[slots] = SLOT_READY
+        self._server_bell.ring()
+
+        deadline = time.monotonic() + self.timeout_s
+        with self._answered:
+            # A result only counts if the server echoed this request's id.
+            while not (np.all(ring.states[slots] == SLOT_DONE) and np.array_equal(ring.answered_ids[slots], ids)):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Inference server did not answer in time.")
+                self._answered.wait(timeout=min(remaining, self.poll_s))
+
+        return ring.outputs[slots]
+
+    def _run(self, ring: _Attachment, batch: np.ndarray) -> np.ndarray:
+        probs = np.empty((batch.shape[0], ring.layout.num_classes), dtype=np.float32)
+
+        start = 0
+        while start < batch.shape[0]:
+            slots, ids = self._acquire(ring, batch.shape[0] - start)
+            chunk = slice(start, start + len(slots))
+            answered = False
+            try:
+                probs[chunk] = self._submit(ring, slots, ids, batch[chunk])
+                answered = True
+            finally:
+                if answered:
+                    self._release(ring, slots)
+                else:
+                    # The server may still be writing to these slots; keep them
+                    # out of the free list until it lets go of them.
+                    self._abandon(ring, slots)
+            start += len(slots)
+
+        return probs
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        batch = np.asarray(batch, dtype=np.float32)
+        ring = self._checkout()
+        try:
+            return self._run(ring, batch)
+        except TimeoutError:
+            # A server that was killed or restarted never answers on the old
+            # mapping; pick up its replacement for the next request.
+            with self._cond:
+                if ring is self._ring:
+                    try:
+                        self._reconnect()
+                    except ConnectionError:
+                        pass
+            raise
+        finally:
+            self._checkin(ring)
+
+
+def serve(name: str, lanes: int, slots_per_lane: int, max_batch: int, batch_window_s: float, poll_s: float):
+    # The server owns the model, so it always loads it locally.
+    os.environ["AYSPI_INFERENCE"] = "local"
+    from backend import predict
+
+    layout = RingLayout(
+        lanes, slots_per_lane, predict.SEQ_LEN, predict.FEATURES_PER_FRAME,
+        int(predict._meta["num_classes"]),
+    )
+    # Held for the server's lifetime; whoever gets it owns the segment name.
+    server_lock = open(os.path.join(LOCK_DIR, f"{name}.server.lock"), "w")
+    try:
+        fcntl.flock(server_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise RuntimeError(f"Another inference server is already serving '{name}'.") from None
+
+    try:
+        shm = shared_memory.SharedMemory(name=name, create=True, size=layout.size)
+    except FileExistsError:
+        # Left behind by a server that was killed without cleanup.
+        stale = shared_memory.SharedMemory(name=name)
+        stale.close()
+        stale.unlink()
+        shm = shared_memory.SharedMemory(name=name, create=True, size=layout.size)
+    header, states, request_ids, answered_ids, inputs, outputs = layout.views(shm.buf)
+    states[:] = SLOT_FREE
+
+    wake_fd = _open_listener(_fifo_path(name, "server"))
+    lane_bells = [_Bell(_fifo_path(name, f"lane{lane}")) for lane in range(lanes)]
+    header[:] = layout.header(epoch=time.time_ns())
+
+    print(
+        f"inference server on shm '{name}': {lanes} lanes x {slots_per_lane} slots, "
+        f"max batch {max_batch}",
+        file=sys.stderr,
+    )
+
+    # Unlink the segment on a normal process-manager shutdown too.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    try:
+        while True:
+            ready = np.flatnonzero(states == SLOT_READY)
+            if ready.size == 0:
+                # Workers ring after marking slots READY; the timeout only
+                # covers a lost wakeup.
+                _wait_for_ring(wake_fd, poll_s)
+                continue
+
+            # Give other workers a moment to add to the batch.
+            if batch_window_s > 0 and ready.size < max_batch:
+                time.sleep(batch_window_s)
+                ready = np.flatnonzero(states == SLOT_READY)
+
+            ready = ready[:max_batch]
+            ids = request_ids[ready]
+            outputs[ready] = predict._infer_local(inputs[ready])
+            answered_ids[ready] = ids
+            states[ready] = SLOT_DONE
+            for lane in np.unique(ready // slots_per_lane):
+                lane_bells[lane].ring()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Tells attached workers to reattach instead of waiting on this segment.
+        header[EPOCH_FIELD] = 0
+        del header, states, request_ids, answered_ids, inputs, outputs
+        shm.close()
+        shm.unlink()
+        for bell in lane_bells:
+            bell.close()
+        os.close(wake_fd)
+        server_lock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dedicated inference process for backend.main workers.")
+    parser.add_argument("--name", default=SHM_NAME)
+    parser.add_argument("--lanes", type=int, default=4, help="one per HTTP worker process")
+    parser.add_argument("--slots-per-lane", type=int, default=64)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--batch-window-ms", type=float, default=1.0)
+    parser.add_argument(
+        "--poll-ms", type=float, default=FALLBACK_POLL_S * 1000.0,
+        help="re-check for work this often in case a wakeup is lost",
+    )
+    args = parser.parse_args()
+
+    serve(
+        args.name,
+        args.lanes,
+        args.slots_per_lane,
+        args.max_batch,
+        args.batch_window_ms / 1000.0,
+        args.poll_ms / 1000.0,
+    )
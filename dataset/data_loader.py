@@ -1,27 +1,21 @@
 import os
+import sys
 import glob
 
 import numpy as np
 
-FEATURES_PER_FRAME = 63
-DEFAULT_SEQ_LEN = 30
-
-
-def resample_or_pad(seq: np.ndarray, target_frames: int) -> np.ndarray:
-    frames = seq.shape[0]
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
-    if frames == target_frames:
-        return seq
+from dataset.preprocessing import (
+    FEATURES_PER_FRAME,
+    resample_indices,
+    resample_or_pad,
+    wrist_relative,
+)
 
-    # pad by repeating last frame
-    if frames < target_frames:
-        pad_count = target_frames - frames
-        pad = np.repeat(seq[-1][None, :], pad_count, axis=0)
-        return np.vstack([seq, pad])
-
-    # downsample evenly
-    idx = np.linspace(0, frames - 1, target_frames).astype(int)
-    return seq[idx]
+DEFAULT_SEQ_LEN = 30
 
 
 def parse_sample(sample):
@@ -67,7 +61,12 @@ def parse_sample(sample):
     return seq.astype(np.float32), label
 
 
-def normalize_folder(input_folder: str, output_folder: str, seq_len: int = DEFAULT_SEQ_LEN):
+def normalize_folder(
+    input_folder: str,
+    output_folder: str,
+    seq_len: int = DEFAULT_SEQ_LEN,
+    compact: bool = True,
+):
     os.makedirs(output_folder, exist_ok=True)
     npy_files = sorted(glob.glob(os.path.join(input_folder, "*.npy")))
 
@@ -75,6 +74,17 @@ def normalize_folder(input_folder: str, output_folder: str, seq_len: int = DEFAU
         fname = os.path.basename(file_path)
         data = np.load(file_path, allow_pickle=True)
 
+        if compact:
+            seqs, labels = [], []
+            for sample in data:
+                seq, label = parse_sample(sample)
+                seqs.append(seq)
+                labels.append(label)
+
+            out_path = os.path.join(output_folder, os.path.splitext(fname)[0] + ".npz")
+            save_compact(out_path, seqs, labels)
+            continue
+
         normalized = []
         for sample in data:
             seq, label = parse_sample(sample)
@@ -89,7 +99,144 @@ def normalize_folder(input_folder: str, output_folder: str, seq_len: int = DEFAU
         np.save(out_path, normalized)
 
 
+def save_compact(out_path: str, seqs, labels):
+    # Store each sample's recorded frames once; the frame count is the
+    # descriptor used to pad/resample to any seq_len at load time.
+    np.savez(
+        out_path,
+        frames=np.concatenate(seqs, axis=0).astype(np.float32),
+        lengths=np.array([seq.shape[0] for seq in seqs], dtype=np.int32),
+        labels=np.array(labels, dtype=np.int64),
+    )
+
+
+def load_raw_samples(input_folder: str):
+    npy_files = sorted(glob.glob(os.path.join(input_folder, "*.npy")))
+    if not npy_files:
+        raise FileNotFoundError(f"No .npy files found in: {input_folder}")
+
+    seqs, labels = [], []
+    for file_path in npy_files:
+        data = np.load(file_path, allow_pickle=True)
+        for sample in data:
+            seq, label = parse_sample(sample)
+            seqs.append(seq)
+            labels.append(label)
+
+    return seqs, np.array(labels, dtype=np.int64)
+
+
+def is_compact_folder(normalized_folder: str) -> bool:
+    return bool(glob.glob(os.path.join(normalized_folder, "*.npz")))
+
+
+def load_compact_dataset(normalized_folder: str):
+    npz_files = sorted(glob.glob(os.path.join(normalized_folder, "*.npz")))
+    if not npz_files:
+        raise FileNotFoundError(f"No .npz files found in: {normalized_folder}")
+
+    frames_list, lengths_list, labels_list = [], [], []
+
+    for file_path in npz_files:
+        with np.load(file_path) as data:
+            frames_list.append(data["frames"])
+            lengths_list.append(data["lengths"].astype(np.int64))
+            labels_list.append(data["labels"].astype(np.int64))
+
+    frames = np.concatenate(frames_list, axis=0)
+    lengths = np.concatenate(lengths_list)
+    labels = np.concatenate(labels_list)
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    return frames, offsets, lengths, labels
+
+
+def _compact_gather_indices(
+    offsets: np.ndarray,
+    lengths: np.ndarray,
+    seq_len: int,
+    indices: np.ndarray | None,
+) -> np.ndarray:
+    if indices is not None:
+        offsets = offsets[indices]
+        lengths = lengths[indices]
+
+    return offsets[:, None] + resample_indices(lengths, seq_len)
+
+
+def expand_compact(
+    frames: np.ndarray,
+    offsets: np.ndarray,
+    lengths: np.ndarray,
+    seq_len: int = DEFAULT_SEQ_LEN,
+    indices: np.ndarray | None = None,
+) -> np.ndarray:
+    return frames[_compact_gather_indices(offsets, lengths, seq_len, indices)]
+
+
+def expansion_counts(
+    offsets: np.ndarray,
+    lengths: np.ndarray,
+    seq_len: int,
+    num_frames: int,
+    indices: np.ndarray | None = None,
+) -> np.ndarray:
+    # How many times each stored frame appears once the selected samples are
+    # expanded to seq_len (0 for frames of unselected samples).
+    idx = _compact_gather_indices(offsets, lengths, seq_len, indices)
+    return np.bincount(idx.ravel(), minlength=num_frames)
+
+
+def window_gather_indices(
+    offsets: np.ndarray,
+    lengths: np.ndarray,
+    seq_len: int,
+    stride: int = 1,
+    indices: np.ndarray | None = None,
+    hop: int | None = None,
+):
+    # Windows of (seq_len - 1) * stride + 1 consecutive recorded frames,
+    # keeping every stride-th one: what a live client buffering every
+    # stride-th camera frame sends. Longer recordings give a window every
+    # `hop` frames plus one flush with the end; shorter ones repeat their
+    # last kept frame, like a hand held still.
+    # Returns (gather indices (W, seq_len), sample index of each window).
+    samples = np.arange(len(lengths)) if indices is None else np.asarray(indices)
+    offsets = offsets[samples]
+    lengths = lengths[samples]
+
+    span = (seq_len - 1) * stride + 1
+    hop = max(1, span // 2) if hop is None else hop
+
+    slack = np.maximum(lengths - span, 0)
+    counts = -(-slack // hop) + 1
+    owner = np.repeat(np.arange(len(samples)), counts)
+    k = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    starts = np.minimum(k * hop, slack[owner])
+
+    last_step = (lengths[owner] - 1 - starts) // stride
+    steps = np.minimum(np.arange(seq_len)[None, :], last_step[:, None])
+    idx = (offsets[owner] + starts)[:, None] + stride * steps
+    return idx, samples[owner]
+
+
+def expand_windows(
+    frames: np.ndarray,
+    offsets: np.ndarray,
+    lengths: np.ndarray,
+    seq_len: int,
+    stride: int = 1,
+    indices: np.ndarray | None = None,
+    hop: int | None = None,
+):
+    idx, owners = window_gather_indices(offsets, lengths, seq_len, stride, indices, hop)
+    return frames[idx], owners
+
+
 def load_normalized_dataset(normalized_folder: str, seq_len: int = DEFAULT_SEQ_LEN):
+    if is_compact_folder(normalized_folder):
+        frames, offsets, lengths, labels = load_compact_dataset(normalized_folder)
+        return expand_compact(frames, offsets, lengths, seq_len), labels
+
     npy_files = sorted(glob.glob(os.path.join(normalized_folder, "*.npy")))
     if not npy_files:
         raise FileNotFoundError(f"No .npy files found in: {normalized_folder}")
@@ -114,16 +261,7 @@ def load_normalized_dataset(normalized_folder: str, seq_len: int = DEFAULT_SEQ_L
 
 
 def make_wrist_relative(X: np.ndarray) -> np.ndarray:
-    X_rel = X.copy()
-
-    for i in range(X_rel.shape[0]):
-        for t in range(X_rel.shape[1]):
-            frame = X_rel[i, t].reshape(21, 3)
-            wrist = frame[0]
-            frame = frame - wrist
-            X_rel[i, t] = frame.reshape(63)
-
-    return X_rel
+    return wrist_relative(X)
 
 
 if __name__ == "__main__":
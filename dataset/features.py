@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+
+from dataset.preprocessing import FEATURES_PER_FRAME, NUM_LANDMARKS
+
+DEFAULT_FEATURE_CONFIG = {
+    "drop_wrist": False,
+    "z_mode": "keep",  # "keep", "drop" or "quantize"
+    "z_step": 0.01,
+    "pca_components": None,
+}
+
+
+class FeatureProjection:
+    # Maps wrist-relative (..., 63) frames to the model's input features.
+    # Runs after wrist-relative normalization and before the scaler.
+
+    def __init__(self, config=None, pca_mean=None, pca_components=None):
+        self.config = {**DEFAULT_FEATURE_CONFIG, **(config or {})}
+        if self.config["z_mode"] not in ("keep", "drop", "quantize"):
+            raise ValueError(f"Unknown z_mode: {self.config['z_mode']!r}")
+
+        coords = np.arange(FEATURES_PER_FRAME).reshape(NUM_LANDMARKS, 3)
+        if self.config["drop_wrist"]:
+            coords = coords[1:]
+        if self.config["z_mode"] == "drop":
+            coords = coords[:, :2]
+        self.columns = coords.reshape(-1)
+
+        self.pca_mean = pca_mean
+        self.pca_components = pca_components
+
+    @property
+    def is_identity(self) -> bool:
+        return self.config == DEFAULT_FEATURE_CONFIG
+
+    @property
+    def selected_dim(self) -> int:
+        return int(self.columns.size)
+
+    @property
+    def output_dim(self) -> int:
+        if self.config["pca_components"]:
+            return int(self.config["pca_components"])
+        return self.selected_dim
+
+    def select(self, X: np.ndarray) -> np.ndarray:
+        if self.config["z_mode"] == "quantize":
+            X = X.copy()
+            step = self.config["z_step"]
+            X[..., 2::3] = np.round(X[..., 2::3] / step) * step
+        if self.selected_dim == FEATURES_PER_FRAME:
+            return X
+        return X[..., self.columns]
+
+    def fit(self, frames: np.ndarray, sample_weight: np.ndarray | None = None) -> "FeatureProjection":
+        n_components = self.config["pca_components"]
+        if not n_components:
+            return self
+
+        X = self.select(frames).astype(np.float64)
+        w = np.ones(len(X)) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+
+        mean = (w[:, None] * X).sum(axis=0) / w.sum()
+        centered = X - mean
+        cov = (centered * w[:, None]).T @ centered / w.sum()
+        eigvals, eigvecs = np.linalg.eigh(cov)
+        order = np.argsort(eigvals)[::-1][:n_components]
+
+        self.pca_mean = mean.astype(np.float32)
+        self.pca_components = eigvecs[:, order].T.astype(np.float32)
+        return self
+
+    def __call__(self, X: np.ndarray) -> np.ndarray:
+        X = self.select(X)
+        if self.config["pca_components"]:
+            if self.pca_components is None:
+                raise ValueError("PCA projection used before fit().")
+            X = (X - self.pca_mean) @ self.pca_components.T
+        return X.astype(np.float32, copy=False)
+
+    def save_pca(self, path: str) -> None:
+        np.savez(path, mean=self.pca_mean, components=self.pca_components)
+
+    def to_metadata(self, pca_path: str | None = None):
+        meta = {"feature_projection": dict(self.config), "model_features": self.output_dim}
+        if self.config["pca_components"]:
+            meta["feature_projection"]["pca_path"] = pca_path
+        return meta
+
+    @classmethod
+    def from_metadata(cls, meta, models_dir: str) -> "FeatureProjection":
+        config = dict(meta.get("feature_projection") or {})
+        pca_path = config.pop("pca_path", None)
+
+        projection = cls(config)
+        if projection.config["pca_components"]:
+            if not pca_path:
+                raise ValueError("feature_projection uses PCA but has no pca_path.")
+            with np.load(os.path.join(models_dir, pca_path)) as data:
+                projection.pca_mean = data["mean"]
+                projection.pca_components = data["components"]
+        return projection
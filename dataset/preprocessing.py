@@ -0,0 +1,91 @@
+import numpy as np
+
+NUM_LANDMARKS = 21
+COORDS_PER_LANDMARK = 3
+FEATURES_PER_FRAME = NUM_LANDMARKS * COORDS_PER_LANDMARK
+
+
+def wrist_relative(X: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    # Subtract the wrist (landmark 0) from every landmark of every frame.
+    # Works on any (..., 63) array; pass out=X to do it in place.
+    # NumPy buffers the wrist operand itself when out overlaps X.
+    if X.ndim == 1 and X.flags.c_contiguous and (out is None or out is X):
+        # Single frames (predict_live) are dominated by per-call overhead,
+        # so they skip the general view/out handling below.
+        pts = X.reshape(NUM_LANDMARKS, COORDS_PER_LANDMARK)
+        if out is None:
+            return (pts - pts[0]).reshape(X.shape)
+        pts -= pts[0].copy()
+        return X
+
+    pts = X.reshape(X.shape[:-1] + (NUM_LANDMARKS, COORDS_PER_LANDMARK))
+
+    if out is None:
+        return np.subtract(pts, pts[..., 0:1, :]).reshape(X.shape)
+
+    out_pts = out.view()
+    out_pts.shape = pts.shape  # raises instead of silently writing to a copy
+    np.subtract(pts, pts[..., 0:1, :], out=out_pts)
+    return out
+
+
+def resample_indices(lengths: np.ndarray, target_frames: int) -> np.ndarray:
+    # Per-sample frame indices that reproduce resample_or_pad for every length.
+    lengths = np.asarray(lengths, dtype=np.int64)
+    steps = np.arange(target_frames, dtype=np.float64)
+
+    if target_frames > 1:
+        pos = steps[None, :] * ((lengths - 1) / (target_frames - 1))[:, None]
+        pos[:, -1] = lengths - 1
+    else:
+        pos = np.zeros((lengths.size, 1), dtype=np.float64)
+
+    # Shorter sequences keep their frames and repeat the last one.
+    short = lengths < target_frames
+    pos[short] = np.minimum(steps[None, :], (lengths[short] - 1)[:, None])
+    return pos.astype(np.int64)
+
+
+def resample_or_pad(seq: np.ndarray, target_frames: int) -> np.ndarray:
+    frames = seq.shape[0]
+
+    if frames == target_frames:
+        return seq
+
+    return seq[resample_indices(np.array([frames]), target_frames)[0]]
+
+
+def resample_or_pad_batch(
+    seqs,
+    target_frames: int,
+    interpolate: bool = False,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    # Pads/resamples sequences of different lengths to (N, target_frames, F)
+    # with one gather over the concatenated frames. With interpolate=True,
+    # downsampling blends the two neighbouring frames instead of picking one.
+    lengths = np.array([s.shape[0] for s in seqs], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    flat = np.concatenate(seqs, axis=0)
+
+    lo = resample_indices(lengths, target_frames)
+    idx = offsets[:, None] + lo
+
+    if out is None:
+        out = np.empty((len(seqs), target_frames, flat.shape[1]), dtype=flat.dtype)
+
+    np.take(flat, idx, axis=0, out=out)
+    if not interpolate:
+        return out
+
+    long = lengths > target_frames
+    if not long.any() or target_frames < 2:
+        return out
+
+    pos = np.arange(target_frames)[None, :] * ((lengths[long] - 1) / (target_frames - 1))[:, None]
+    pos[:, -1] = lengths[long] - 1
+    w = (pos - lo[long]).astype(flat.dtype)[:, :, None]
+    hi = idx[long] + (w[:, :, 0] > 0)
+    a = out[long]
+    out[long] = a + (flat[hi] - a) * w
+    return out
@@ -4,6 +4,7 @@ import "./webcamfeed.css";
 
 const DEFAULT_SEQ_LEN = 30;
 const SEND_INTERVAL_MS = 250;
+const MAX_SEND_INTERVAL_MS = 2000;
 const API_BASE = import.meta.env.VITE_API_URL || "http://localhost:8000";
 
 function WebcamFeed({ showLandmarks = true }) {
@@ -13,12 +14,18 @@ function WebcamFeed({ showLandmarks = true }) {
   const handsRef = useRef(null);
 
   const sequenceRef = useRef([]);
+  const frameCountRef = useRef(0);
   const lastSentRef = useRef(0);
   const inFlightRef = useRef(false);
+  const sendIntervalRef = useRef(SEND_INTERVAL_MS);
+  const clientIdRef = useRef(
+    window.crypto?.randomUUID?.() ?? Math.random().toString(36).slice(2)
+  );
 
   const showLandmarksRef = useRef(showLandmarks);
 
   const [seqLen, setSeqLen] = useState(DEFAULT_SEQ_LEN);
+  const [frameStride, setFrameStride] = useState(1);
   const [prediction, setPrediction] = useState({ letter: "-", confidence: 0 });
   const [status, setStatus] = useState("Waiting for hand...");
   const [error, setError] = useState("");
@@ -56,6 +63,7 @@ function WebcamFeed({ showLandmarks = true }) {
       .then((data) => {
         if (!isMounted) return;
         if (data?.seq_len) setSeqLen(data.seq_len);
+        if (data?.frame_stride) setFrameStride(data.frame_stride);
         setBackendInfo("");
       })
       .catch(() => {
@@ -70,7 +78,8 @@ function WebcamFeed({ showLandmarks = true }) {
 
   useEffect(() => {
     sequenceRef.current = [];
-  }, [seqLen]);
+    frameCountRef.current = 0;
+  }, [seqLen, frameStride]);
 
   useEffect(() => {
     let stream;
@@ -203,6 +212,11 @@ function WebcamFeed({ showLandmarks = true }) {
         }
       }
 
+      // Keep every frameStride-th frame so the window matches the model's.
+      const keepFrame = frameCountRef.current % frameStride === 0;
+      frameCountRef.current += 1;
+      if (!keepFrame) return;
+
       const frame = [];
       for (const lm of landmarks) {
         frame.push(lm.x, lm.y, lm.z);
@@ -217,7 +231,7 @@ function WebcamFeed({ showLandmarks = true }) {
       const shouldSend =
         sequenceRef.current.length === seqLen &&
         !inFlightRef.current &&
-        now - lastSentRef.current > SEND_INTERVAL_MS;
+        now - lastSentRef.current > sendIntervalRef.current;
 
       if (!shouldSend) return;
 
@@ -226,7 +240,10 @@ function WebcamFeed({ showLandmarks = true }) {
 
       fetch(`${API_BASE}/predict`, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: {
+          "Content-Type": "application/json",
+          "X-Client-Id": clientIdRef.current,
+        },
         body: JSON.stringify({ landmarks: sequenceRef.current.flat() }),
       })
         .then(async (res) => {
@@ -238,6 +255,14 @@ function WebcamFeed({ showLandmarks = true }) {
         })
         .then((data) => {
           setBackendInfo("");
+
+          // The backend recommends when to send next based on its load and
+          // how stable this client's predictions have been.
+          const nextInterval = Number(data?.next_interval_ms);
+          sendIntervalRef.current = Number.isFinite(nextInterval)
+            ? Math.min(Math.max(nextInterval, SEND_INTERVAL_MS), MAX_SEND_INTERVAL_MS)
+            : SEND_INTERVAL_MS;
+
           if (data?.error) {
             setError(data.error);
           } else {
@@ -277,7 +302,7 @@ function WebcamFeed({ showLandmarks = true }) {
       hands.close();
       handsRef.current = null;
     };
-  }, [seqLen]);
+  }, [seqLen, frameStride]);
 
   const confidencePercent = Math.round(prediction.confidence * 100);
 
@@ -0,0 +1,198 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from dataset.data_loader import expand_compact, is_compact_folder, load_compact_dataset
+from dataset.preprocessing import (
+    resample_or_pad,
+    resample_or_pad_batch,
+    wrist_relative,
+)
+
+# Timing is opt-in: AYSPI_BENCHMARK=1 python -m pytest tests -s
+BENCHMARK = os.environ.get("AYSPI_BENCHMARK") == "1"
+
+# Allowed timing noise before a path counts as slower than legacy.
+SPEED_TOLERANCE = 1.1
+
+TARGETS = (1, 2, 10, 15, 30, 60)
+
+# Frozen copies of the per-path implementations dataset.preprocessing
+# replaced. Outputs must stay bit-identical to these.
+
+
+def legacy_resample_or_pad(seq: np.ndarray, target_frames: int) -> np.ndarray:
+    frames = seq.shape[0]
+
+    if frames == target_frames:
+        return seq
+
+    if frames < target_frames:
+        pad_count = target_frames - frames
+        pad = np.repeat(seq[-1][None, :], pad_count, axis=0)
+        return np.vstack([seq, pad])
+
+    idx = np.linspace(0, frames - 1, target_frames).astype(int)
+    return seq[idx]
+
+
+def legacy_backend_wrist_relative(seq: np.ndarray) -> np.ndarray:
+    seq_rel = seq.reshape(seq.shape[0], 21, 3)
+    seq_rel = seq_rel - seq_rel[:, 0:1, :]
+    return seq_rel.reshape(seq.shape[0], -1)
+
+
+def legacy_make_wrist_relative(X: np.ndarray) -> np.ndarray:
+    X_rel = X.copy()
+
+    for i in range(X_rel.shape[0]):
+        for t in range(X_rel.shape[1]):
+            frame = X_rel[i, t].reshape(21, 3)
+            wrist = frame[0]
+            frame = frame - wrist
+            X_rel[i, t] = frame.reshape(63)
+
+    return X_rel
+
+
+def legacy_wrist_relative_frame(frame63: np.ndarray) -> np.ndarray:
+    pts = frame63.reshape(21, 3)
+    wrist = pts[0].copy()
+    pts = pts - wrist
+    return pts.reshape(63)
+
+
+def _random_sequences(rng, count: int, max_frames: int = 90):
+    lengths = rng.integers(1, max_frames, count)
+    return [rng.standard_normal((n, 63)).astype(np.float32) for n in lengths]
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+@pytest.fixture
+def seqs(rng):
+    return _random_sequences(rng, 500)
+
+
+@pytest.fixture
+def X(rng):
+    return rng.standard_normal((64, 30, 63)).astype(np.float32)
+
+
+@pytest.mark.parametrize("target", TARGETS)
+def test_resample_or_pad_matches_legacy(seqs, target):
+    expected = np.stack([legacy_resample_or_pad(s, target) for s in seqs])
+    single = np.stack([resample_or_pad(s, target) for s in seqs])
+    assert np.array_equal(single, expected)
+
+
+@pytest.mark.parametrize("target", TARGETS)
+def test_resample_or_pad_batch_matches_legacy(seqs, target):
+    expected = np.stack([legacy_resample_or_pad(s, target) for s in seqs])
+    assert np.array_equal(resample_or_pad_batch(seqs, target), expected)
+
+    out = np.full_like(expected, np.nan)
+    reused = resample_or_pad_batch(seqs, target, out=out)
+    assert reused is out
+    assert np.array_equal(out, expected)
+
+
+@pytest.mark.parametrize("target", TARGETS)
+def test_interpolation_leaves_padded_samples_alone(seqs, target):
+    expected = np.stack([legacy_resample_or_pad(s, target) for s in seqs])
+    interp = resample_or_pad_batch(seqs, target, interpolate=True)
+    short = np.array([s.shape[0] <= target for s in seqs])
+    assert np.array_equal(interp[short], expected[short])
+
+
+def test_wrist_relative_batch_matches_make_wrist_relative(X):
+    assert np.array_equal(wrist_relative(X), legacy_make_wrist_relative(X))
+
+
+def test_wrist_relative_window_matches_backend(X):
+    window = X[0].copy()
+    assert np.array_equal(wrist_relative(window), legacy_backend_wrist_relative(window))
+
+
+def test_wrist_relative_frame_matches_predict_live(X):
+    frame = X[0, 0].copy()
+    expected = legacy_wrist_relative_frame(frame)
+    assert np.array_equal(wrist_relative(frame), expected)
+    assert np.array_equal(wrist_relative(frame, out=frame), expected)
+
+    strided = np.repeat(X[0, 1], 2)[::2]
+    assert np.array_equal(wrist_relative(strided), legacy_wrist_relative_frame(strided))
+
+
+def test_wrist_relative_in_place_batch(X):
+    expected = legacy_make_wrist_relative(X)
+    flat = X.reshape(-1, 63)
+    assert wrist_relative(flat, out=flat) is flat
+    assert np.array_equal(X, expected)
+
+
+def test_dataset_matches_legacy():
+    folder = os.path.join(PROJECT_ROOT, "dataset_normalized")
+    if not is_compact_folder(folder):
+        pytest.skip("no compact dataset in dataset_normalized/")
+
+    frames, offsets, lengths, _ = load_compact_dataset(folder)
+    seqs = [frames[o:o + n] for o, n in zip(offsets, lengths)]
+    expected = np.stack([legacy_resample_or_pad(s, 30) for s in seqs])
+    assert np.array_equal(resample_or_pad_batch(seqs, 30), expected)
+    assert np.array_equal(expand_compact(frames, offsets, lengths, 30), expected)
+    assert np.array_equal(wrist_relative(expected), legacy_make_wrist_relative(expected))
+
+
+def _best_of(fn, repeats: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+@pytest.mark.skipif(not BENCHMARK, reason="set AYSPI_BENCHMARK=1 to run timings")
+def test_not_slower_than_legacy(rng):
+    seqs = _random_sequences(rng, 2000)
+    X = rng.standard_normal((2000, 30, 63)).astype(np.float32)
+    out = np.empty_like(X)
+    frame = X[0, 0].copy()
+
+    rows = [
+        (
+            "resample 2000 ragged -> 30",
+            _best_of(lambda: [legacy_resample_or_pad(s, 30) for s in seqs]),
+            _best_of(lambda: resample_or_pad_batch(seqs, 30, out=out)),
+        ),
+        (
+            "wrist_relative (2000, 30, 63)",
+            _best_of(lambda: legacy_make_wrist_relative(X), repeats=1),
+            _best_of(lambda: wrist_relative(X, out=out)),
+        ),
+        (
+            "wrist_relative single frame x1000",
+            _best_of(lambda: [legacy_wrist_relative_frame(frame) for _ in range(1000)]),
+            _best_of(lambda: [wrist_relative(frame, out=frame) for _ in range(1000)]),
+        ),
+    ]
+
+    print(f"\n{'operation':36} {'legacy ms':>10} {'shared ms':>10} {'speedup':>8}")
+    for name, legacy_ms, shared_ms in rows:
+        print(f"{name:36} {legacy_ms:10.2f} {shared_ms:10.2f} {legacy_ms / shared_ms:7.1f}x")
+
+    # Every row is a path something depends on: training and /predict_batch
+    # use the batched ones, predict_live.py the single frame.
+    slower = [name for name, legacy_ms, shared_ms in rows if shared_ms >= legacy_ms * SPEED_TOLERANCE]
+    assert not slower, f"slower than the legacy implementation: {slower}"
@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import argparse
+
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+
+import numpy as np
+import tensorflow as tf
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from backend.numpy_engine import NumpySequenceClassifier, file_fingerprint
+
+MODELS_DIR = os.path.join(PROJECT_ROOT, "models")
+METADATA_PATH = os.path.join(MODELS_DIR, "metadata.json")
+
+
+def _activation_name(activation) -> str:
+    return getattr(activation, "__name__", str(activation))
+
+
+def _check_gru(layer):
+    if not layer.reset_after:
+        raise ValueError(f"{layer.name}: only reset_after=True GRUs are supported")
+    if _activation_name(layer.activation) != "tanh":
+        raise ValueError(f"{layer.name}: unsupported activation {_activation_name(layer.activation)}")
+    if _activation_name(layer.recurrent_activation) != "sigmoid":
+        raise ValueError(
+            f"{layer.name}: unsupported recurrent activation {_activation_name(layer.recurrent_activation)}"
+        )
+
+
+def export_weights(model, out_path: str, fingerprints=None) -> None:
+    arrays = {key: np.array(value) for key, value in (fingerprints or {}).items()}
+    layer_types = []
+
+    for layer in model.layers:
+        kind = type(layer).__name__
+        prefix = f"{len(layer_types)}/"
+
+        if kind in ("InputLayer", "Dropout"):
+            continue
+
+        if kind == "Conv1D":
+            if layer.padding != "same" or tuple(layer.strides) != (1,) or tuple(layer.dilation_rate) != (1,):
+                raise ValueError(f"{layer.name}: only stride-1 'same' convolutions are supported")
+            kernel, bias = layer.get_weights()
+            arrays[prefix + "kernel"] = kernel
+            arrays[prefix + "bias"] = bias
+            arrays[prefix + "activation"] = np.array(_activation_name(layer.activation))
+            layer_types.append("conv1d")
+
+        elif kind == "BatchNormalization":
+            channels = np.asarray(layer.moving_mean).shape[0]
+            gamma = np.asarray(layer.gamma) if layer.scale else np.ones(channels, dtype=np.float32)
+            beta = np.asarray(layer.beta) if layer.center else np.zeros(channels, dtype=np.float32)
+            arrays[prefix + "gamma"] = gamma
+            arrays[prefix + "beta"] = beta
+            arrays[prefix + "moving_mean"] = np.asarray(layer.moving_mean)
+            arrays[prefix + "moving_variance"] = np.asarray(layer.moving_variance)
+            arrays[prefix + "epsilon"] = np.array(layer.epsilon, dtype=np.float32)
+            layer_types.append("batch_norm")
+
+        elif kind == "Bidirectional":
+            if layer.merge_mode != "concat" or not layer.return_sequences:
+                raise ValueError(f"{layer.name}: only concat merge with return_sequences is supported")
+            for direction, rnn in (("forward", layer.forward_layer), ("backward", layer.backward_layer)):
+                _check_gru(rnn)
+                kernel, recurrent_kernel, bias = rnn.get_weights()
+                arrays[prefix + f"{direction}_kernel"] = kernel
+                arrays[prefix + f"{direction}_recurrent_kernel"] = recurrent_kernel
+                arrays[prefix + f"{direction}_bias"] = bias.reshape(2, -1)
+            layer_types.append("bigru")
+
+        elif kind == "GlobalAveragePooling1D":
+            layer_types.append("global_avg_pool")
+
+        elif kind == "Dense":
+            kernel, bias = layer.get_weights()
+            arrays[prefix + "kernel"] = kernel
+            arrays[prefix + "bias"] = bias
+            arrays[prefix + "activation"] = np.array(_activation_name(layer.activation))
+            layer_types.append("dense")
+
+        else:
+            raise ValueError(f"Unsupported layer for numpy export: {kind} ({layer.name})")
+
+    arrays["layer_types"] = np.array(layer_types)
+    np.savez(out_path, **arrays)
+
+
+def verify_export(model, out_path: str, seq_len: int, features_per_frame: int,
+                  samples: int = 64, atol: float = 1e-4) -> float:
+    rng = np.random.default_rng(0)
+    batch = rng.standard_normal((samples, seq_len, features_per_frame)).astype(np.float32)
+
+    expected = model(batch, training=False).numpy()
+    actual = NumpySequenceClassifier.load(out_path)(batch)
+
+    max_diff = float(np.max(np.abs(expected - actual)))
+    if max_diff > atol:
+        raise AssertionError(f"NumPy engine differs from Keras by {max_diff:.2e} (atol {atol:.0e})")
+    return max_diff
+
+
+def main(atol: float = 1e-4):
+    with open(METADATA_PATH, "r") as f:
+        meta = json.load(f)
+
+    model_path = os.path.join(MODELS_DIR, meta.get("model_path", "asl_sequence_classifier.keras"))
+    scaler_path = os.path.join(MODELS_DIR, meta.get("scaler_path", "scaler.pkl"))
+    weights_name = meta.get("numpy_weights_path", "asl_sequence_classifier.npz")
+    out_path = os.path.join(MODELS_DIR, weights_name)
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+    # The backend refuses weights whose source model or scaler has since changed.
+    export_weights(model, out_path, {
+        "source_model_sha256": file_fingerprint(model_path),
+        "source_scaler_sha256": file_fingerprint(scaler_path),
+    })
+
+    max_diff = verify_export(
+        model,
+        out_path,
+        int(meta["seq_len"]),
+        int(meta.get("model_features", meta["features_per_frame"])),
+        atol=atol,
+    )
+    print(f"exported {out_path} (max abs diff vs Keras: {max_diff:.2e})")
+
+    meta["numpy_weights_path"] = weights_name
+    with open(METADATA_PATH, "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--atol", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    main(atol=args.atol)
@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 import time
 from collections import deque
@@ -11,6 +12,12 @@ import numpy as np
 import joblib
 import tensorflow as tf
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from dataset.features import FeatureProjection
+from dataset.preprocessing import wrist_relative
 
 
 MODELS_DIR = "models"
@@ -35,7 +42,9 @@ with open(METADATA_PATH, "r") as f:
     meta = json.load(f)
 
 SEQ_LEN = int(meta["seq_len"])
+FRAME_STRIDE = int(meta.get("frame_stride", 1))
 FEATURES_PER_FRAME = int(meta["features_per_frame"])
+MODEL_FEATURES = int(meta.get("model_features", FEATURES_PER_FRAME))
 
 MODEL_PATH = os.path.join(MODELS_DIR, meta.get("model_path", "asl_sequence_classifier.keras"))
 SCALER_PATH = os.path.join(MODELS_DIR, meta.get("scaler_path", "scaler.pkl"))
@@ -49,6 +58,7 @@ if not os.path.exists(SCALER_PATH):
 
 model = tf.keras.models.load_model(MODEL_PATH, compile=False)
 scaler = joblib.load(SCALER_PATH)
+projection = FeatureProjection.from_metadata(meta, MODELS_DIR)
 
 
 mp_hands = mp.solutions.hands
@@ -70,6 +80,7 @@ webcam.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
 sequence_buffer = deque(maxlen=SEQ_LEN)
 
 pred_buffer = deque(maxlen=8)
+frame_counter = 0
 
 
 def extract_frame_features(hand_landmarks) -> np.ndarray:
@@ -79,13 +90,6 @@ def extract_frame_features(hand_landmarks) -> np.ndarray:
     return np.array(arr, dtype=np.float32)
 
 
-def wrist_relative_frame(frame63: np.ndarray) -> np.ndarray:
-    pts = frame63.reshape(21, 3)
-    wrist = pts[0].copy()
-    pts = pts - wrist
-    return pts.reshape(63)
-
-
 def stable_vote(indices):
     if len(indices) == 0:
         return None
@@ -116,16 +120,18 @@ while True:
         frame63 = extract_frame_features(hand)
 
         if frame63.shape[0] == FEATURES_PER_FRAME:
-            frame63 = wrist_relative_frame(frame63)
+            frame63 = wrist_relative(frame63, out=frame63)
 
-            sequence_buffer.append(frame63)
+            if frame_counter % FRAME_STRIDE == 0:
+                sequence_buffer.append(frame63)
+            frame_counter += 1
 
             if len(sequence_buffer) == SEQ_LEN:
                 seq = np.array(sequence_buffer, dtype=np.float32) 
 
-                seq_flat = seq.reshape(SEQ_LEN, FEATURES_PER_FRAME)
+                seq_flat = projection(seq.reshape(SEQ_LEN, FEATURES_PER_FRAME))
                 seq_scaled = scaler.transform(seq_flat)
-                seq_input = seq_scaled.reshape(1, SEQ_LEN, FEATURES_PER_FRAME)
+                seq_input = seq_scaled.reshape(1, SEQ_LEN, MODEL_FEATURES)
 
                 probs = model.predict(seq_input, verbose=0)[0]
                 pred_index = int(np.argmax(probs))
@@ -1,6 +1,8 @@
 import os
 import sys
 import json
+import time
+import argparse
 
 import joblib
 import numpy as np
@@ -16,10 +18,30 @@ if PROJECT_ROOT not in sys.path:
 from dataset.data_loader import (
     normalize_folder,
     load_normalized_dataset,
-    make_wrist_relative
+    load_compact_dataset,
+    load_raw_samples,
+    save_compact,
+    expand_compact,
+    expansion_counts,
+    is_compact_folder,
+    window_gather_indices,
 )
+from dataset.preprocessing import wrist_relative
 
+from dataset.features import FeatureProjection
 from models.asl_sequence_classifier import build_asl_sequence_classifier
+from training import export_numpy_model
+
+MOTION_LABELS = (10, 26)  # J, Z
+
+FEATURE_PRESETS = {
+    "full": {},
+    "no_wrist": {"drop_wrist": True},
+    "no_wrist_z_quantized": {"drop_wrist": True, "z_mode": "quantize"},
+    "no_wrist_no_z": {"drop_wrist": True, "z_mode": "drop"},
+    "pca_24": {"drop_wrist": True, "pca_components": 24},
+    "pca_16": {"drop_wrist": True, "pca_components": 16},
+}
 
 
 def resolve_normalized_folder(project_root: str) -> str:
@@ -40,7 +62,70 @@ def folder_has_files(path: str) -> bool:
     return False
 
 
-def main():
+class CompactBatches(tf.keras.utils.Sequence):
+    # Expands compact samples to (batch, seq_len, features) one batch at a time.
+
+    def __init__(self, frames, offsets, lengths, labels, indices, seq_len, batch_size=64, shuffle=True):
+        super().__init__()
+        self.frames = frames
+        self.offsets = offsets
+        self.lengths = lengths
+        self.labels = labels
+        self.indices = np.array(indices)
+        self.seq_len = seq_len
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.on_epoch_end()
+
+    def __len__(self):
+        return int(np.ceil(len(self.indices) / self.batch_size))
+
+    def __getitem__(self, i):
+        batch_idx = self.indices[i * self.batch_size:(i + 1) * self.batch_size]
+        X = expand_compact(self.frames, self.offsets, self.lengths, self.seq_len, indices=batch_idx)
+        return X, self.labels[batch_idx]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.indices)
+
+
+def load_compact_training_data(
+    normalized_folder: str, seq_len: int, models_folder: str, projection: FeatureProjection
+):
+    frames, offsets, lengths, y = load_compact_dataset(normalized_folder)
+    features_per_frame = frames.shape[1]
+
+    # Wrist-relative, projection and scaling are per frame, so they are
+    # applied to the stored frames once instead of to every expanded copy.
+    frames = wrist_relative(frames)
+
+    train_idx, test_idx = train_test_split(
+        np.arange(len(y)),
+        test_size=0.2,
+        random_state=42,
+        stratify=y
+    )
+
+    # Weighting each stored frame by its repeat count gives the same
+    # statistics as fitting on the padded training set.
+    weights = expansion_counts(offsets, lengths, seq_len, len(frames), indices=train_idx)
+    frames = projection.fit(frames, sample_weight=weights)(frames)
+
+    scaler = StandardScaler()
+    scaler.fit(frames, sample_weight=weights)
+    joblib.dump(scaler, os.path.join(models_folder, "scaler.pkl"))
+
+    frames = scaler.transform(frames).astype(np.float32)
+
+    train_data = CompactBatches(frames, offsets, lengths, y, train_idx, seq_len)
+    X_test_scaled = expand_compact(frames, offsets, lengths, seq_len, indices=test_idx)
+    y_test = y[test_idx]
+
+    return train_data, X_test_scaled, y_test, features_per_frame, int(np.max(y)) + 1
+
+
+def main(compact: bool = False, seq_len: int = 30, feature_config=None):
     tf.keras.utils.set_random_seed(42)
 
     dataset_folder = os.path.join(PROJECT_ROOT, "dataset")
@@ -55,41 +140,55 @@ def main():
         os.makedirs(normalized_folder, exist_ok=True)
         normalize_folder(dataset_folder, normalized_folder)
 
-    X, y = load_normalized_dataset(normalized_folder)
+    projection = FeatureProjection(feature_config)
 
-    if X.ndim != 3:
-        raise ValueError(f"Expected X shape (N, seq_len, features). Got: {X.shape}")
+    if compact:
+        if not is_compact_folder(normalized_folder):
+            raise ValueError(f"{normalized_folder} is not in compact format. Re-run normalize_folder.")
+        train_data, X_test_scaled, y_test, features_per_frame, num_classes = load_compact_training_data(
+            normalized_folder, seq_len, models_folder, projection
+        )
+    else:
+        X, y = load_normalized_dataset(normalized_folder, seq_len=seq_len)
 
-    seq_len = X.shape[1]
-    features_per_frame = X.shape[2]
+        if X.ndim != 3:
+            raise ValueError(f"Expected X shape (N, seq_len, features). Got: {X.shape}")
 
-    X = make_wrist_relative(X)
+        seq_len = X.shape[1]
+        features_per_frame = X.shape[2]
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X,
-        y,
-        test_size=0.2,
-        random_state=42,
-        stratify=y
-    )
+        X = wrist_relative(X)
 
-    scaler = StandardScaler()
+        X_train, X_test, y_train, y_test = train_test_split(
+            X,
+            y,
+            test_size=0.2,
+            random_state=42,
+            stratify=y
+        )
 
-    X_train_2d = X_train.reshape(-1, features_per_frame)
-    X_test_2d = X_test.reshape(-1, features_per_frame)
+        X_train_2d = X_train.reshape(-1, features_per_frame)
+        X_test_2d = X_test.reshape(-1, features_per_frame)
 
-    X_train_scaled = scaler.fit_transform(X_train_2d).reshape(-1, seq_len, features_per_frame)
-    X_test_scaled = scaler.transform(X_test_2d).reshape(-1, seq_len, features_per_frame)
+        X_train_2d = projection.fit(X_train_2d)(X_train_2d)
+        X_test_2d = projection(X_test_2d)
+        model_features = projection.output_dim
 
-    scaler_path = os.path.join(models_folder, "scaler.pkl")
-    joblib.dump(scaler, scaler_path)
+        scaler = StandardScaler()
 
-    num_classes = int(np.max(y)) + 1
+        X_train_scaled = scaler.fit_transform(X_train_2d).reshape(-1, seq_len, model_features)
+        X_test_scaled = scaler.transform(X_test_2d).reshape(-1, seq_len, model_features)
+
+        scaler_path = os.path.join(models_folder, "scaler.pkl")
+        joblib.dump(scaler, scaler_path)
+
+        train_data = (X_train_scaled, y_train)
+        num_classes = int(np.max(y)) + 1
 
     model = build_asl_sequence_classifier(
         num_classes=num_classes,
         seq_len=seq_len,
-        features_per_frame=features_per_frame
+        features_per_frame=projection.output_dim
     )
 
     model.compile(
@@ -121,13 +220,22 @@ def main():
         )
     ]
 
-    history = model.fit(
-        X_train_scaled, y_train,
-        validation_data=(X_test_scaled, y_test),
-        epochs=100,
-        batch_size=64,
-        callbacks=callbacks
-    )
+    if compact:
+        history = model.fit(
+            train_data,
+            validation_data=(X_test_scaled, y_test),
+            epochs=100,
+            callbacks=callbacks
+        )
+    else:
+        X_train_scaled, y_train = train_data
+        history = model.fit(
+            X_train_scaled, y_train,
+            validation_data=(X_test_scaled, y_test),
+            epochs=100,
+            batch_size=64,
+            callbacks=callbacks
+        )
 
     loss, acc = model.evaluate(X_test_scaled, y_test, verbose=0)
 
@@ -136,6 +244,11 @@ def main():
     final_model_path = os.path.join(models_folder, "asl_sequence_classifier.keras")
     model.save(final_model_path)
 
+    pca_path = None
+    if projection.config["pca_components"]:
+        pca_path = "feature_pca.npz"
+        projection.save_pca(os.path.join(models_folder, pca_path))
+
     metadata = {
         "seq_len": int(seq_len),
         "features_per_frame": int(features_per_frame),
@@ -144,12 +257,484 @@ def main():
         "model_path": "asl_sequence_classifier.keras",
         "best_model_path": "best_asl_sequence_classifier.keras",
         "normalized_folder_used": os.path.relpath(normalized_folder, PROJECT_ROOT),
+        **projection.to_metadata(pca_path),
+        "lineage": [
+            {
+                "mode": "full",
+                "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "test_accuracy": float(acc),
+            }
+        ],
+    }
+
+    metadata_path = os.path.join(models_folder, "metadata.json")
+    with open(metadata_path, "w") as f:
+        json.dump(metadata, f, indent=2)
+
+    _refresh_numpy_export(models_folder, metadata)
+
+
+def _refresh_numpy_export(models_folder: str, metadata):
+    # An existing NumPy export is re-exported so AYSPI_ENGINE=numpy keeps
+    # matching the model and scaler that were just saved.
+    weights_name = metadata.get("numpy_weights_path", "asl_sequence_classifier.npz")
+    if os.path.exists(os.path.join(models_folder, weights_name)):
+        export_numpy_model.main()
+
+
+# Enough new samples for an 80/20 split to keep at least one for validation.
+MIN_NEW_SAMPLES = 5
+
+
+def _validation_split(idx: np.ndarray):
+    # A single replayed sample cannot be split; train on it and skip validation.
+    if len(idx) < 2:
+        return idx, idx[:0]
+    return train_test_split(idx, test_size=0.2, random_state=42)
+
+
+def incremental_main(
+    new_data_folder: str,
+    replay_ratio: float = 1.0,
+    epochs: int = 20,
+    learning_rate: float = 1e-4,
+):
+    if replay_ratio < 0:
+        raise ValueError(f"--replay-ratio must be >= 0, got {replay_ratio}.")
+
+    tf.keras.utils.set_random_seed(42)
+    rng = np.random.default_rng(42)
+
+    models_folder = os.path.join(PROJECT_ROOT, "models")
+    metadata_path = os.path.join(models_folder, "metadata.json")
+    with open(metadata_path, "r") as f:
+        metadata = json.load(f)
+
+    seq_len = int(metadata["seq_len"])
+    stride = int(metadata.get("frame_stride", 1))
+    num_classes = int(metadata["num_classes"])
+    model_path = os.path.join(models_folder, metadata.get("model_path", "asl_sequence_classifier.keras"))
+    scaler_path = os.path.join(models_folder, metadata.get("scaler_path", "scaler.pkl"))
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+    scaler = joblib.load(scaler_path)
+    projection = FeatureProjection.from_metadata(metadata, models_folder)
+    model_features = projection.output_dim
+
+    new_seqs, y_new = load_raw_samples(new_data_folder)
+    if len(y_new) < MIN_NEW_SAMPLES:
+        raise ValueError(
+            f"{new_data_folder} has {len(y_new)} sample(s); incremental training needs at least "
+            f"{MIN_NEW_SAMPLES} so some can be held out for validation."
+        )
+    if int(np.max(y_new)) >= num_classes:
+        raise ValueError(
+            f"New data has label {int(np.max(y_new))} but the deployed model has {num_classes} classes."
+        )
+
+    sample_windows = metadata.get("sample_windows")
+
+    def expand(frames, offsets, lengths, labels, idx):
+        # Cut inputs the way the deployed model was trained: live-style
+        # windows for study configs, whole resampled recordings otherwise.
+        if sample_windows:
+            rows, owners = window_gather_indices(offsets, lengths, seq_len, stride, idx, sample_windows["hop"])
+            X, y = frames[rows], labels[owners]
+        else:
+            X, y = expand_compact(frames, offsets, lengths, seq_len, indices=idx), labels[idx]
+        return projection(wrist_relative(X)), y
+
+    new_frames = np.concatenate(new_seqs, axis=0)
+    new_lengths = np.array([seq.shape[0] for seq in new_seqs], dtype=np.int64)
+    new_offsets = np.concatenate([[0], np.cumsum(new_lengths)[:-1]]).astype(np.int64)
+
+    # Split by sample so windows of one recording never straddle train/val.
+    new_train_idx, new_val_idx = train_test_split(np.arange(len(y_new)), test_size=0.2, random_state=42)
+    X_new_train, y_new_train = expand(new_frames, new_offsets, new_lengths, y_new, new_train_idx)
+    X_new_val, y_new_val = expand(new_frames, new_offsets, new_lengths, y_new, new_val_idx)
+
+    # Fold only the new frames into the deployed scaler's running statistics.
+    scaler.partial_fit(X_new_train.reshape(-1, model_features))
+
+    normalized_folder = os.path.join(PROJECT_ROOT, metadata.get("normalized_folder_used", "dataset_normalized"))
+    old_frames, old_offsets, old_lengths, y_old = load_compact_dataset(normalized_folder)
+
+    # --replay-ratio 0 fine-tunes on the new data only.
+    replay_count = min(len(y_old), int(round(replay_ratio * len(y_new))))
+    replay_idx = rng.choice(len(y_old), size=replay_count, replace=False)
+
+    replay_train_idx, replay_val_idx = _validation_split(replay_idx)
+    X_replay_train, y_replay_train = expand(old_frames, old_offsets, old_lengths, y_old, replay_train_idx)
+    X_replay_val, y_replay_val = expand(old_frames, old_offsets, old_lengths, y_old, replay_val_idx)
+
+    def scale(X):
+        if len(X) == 0:
+            return X
+        return scaler.transform(X.reshape(-1, model_features)).reshape(-1, seq_len, model_features)
+
+    X_train = scale(np.concatenate([X_new_train, X_replay_train]))
+    y_train = np.concatenate([y_new_train, y_replay_train])
+    X_new_val, X_replay_val = scale(X_new_val), scale(X_replay_val)
+    X_val = np.concatenate([X_new_val, X_replay_val])
+    y_val = np.concatenate([y_new_val, y_replay_val])
+
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"]
+    )
+
+    model.fit(
+        X_train, y_train,
+        validation_data=(X_val, y_val),
+        epochs=epochs,
+        batch_size=64,
+        callbacks=[
+            tf.keras.callbacks.EarlyStopping(
+                monitor="val_accuracy",
+                patience=5,
+                restore_best_weights=True
+            )
+        ]
+    )
+
+    _, new_acc = model.evaluate(X_new_val, y_new_val, verbose=0)
+    if len(y_replay_val):
+        _, replay_acc = model.evaluate(X_replay_val, y_replay_val, verbose=0)
+        print(f"new data val accuracy: {new_acc:.4f}  replay val accuracy: {replay_acc:.4f}")
+    else:
+        replay_acc = None
+        print(f"new data val accuracy: {new_acc:.4f}  (no replay validation samples)")
+
+    model.save(model_path)
+    joblib.dump(scaler, scaler_path)
+
+    # Keep the new samples in the normalized dataset so later runs replay them.
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    merged_path = os.path.join(normalized_folder, f"incremental_{stamp}.npz")
+    save_compact(merged_path, new_seqs, y_new)
+
+    metadata.setdefault("lineage", []).append(
+        {
+            "mode": "incremental",
+            "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "new_data_folder": os.path.relpath(os.path.abspath(new_data_folder), PROJECT_ROOT),
+            "merged_into": os.path.relpath(merged_path, PROJECT_ROOT),
+            "new_samples": int(len(y_new)),
+            "replay_samples": int(replay_count),
+            "epochs": int(epochs),
+            "learning_rate": float(learning_rate),
+            "new_val_accuracy": float(new_acc),
+            "replay_val_accuracy": None if replay_acc is None else float(replay_acc),
+            "scaler_samples_seen": int(np.max(scaler.n_samples_seen_)),
+        }
+    )
+
+    with open(metadata_path, "w") as f:
+        json.dump(metadata, f, indent=2)
+
+    _refresh_numpy_export(models_folder, metadata)
+
+
+def measure_latency_ms(model, seq_len: int, model_features: int, runs: int = 50) -> float:
+    x = np.zeros((1, seq_len, model_features), dtype=np.float32)
+    model(x, training=False)
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        model(x, training=False)
+    return (time.perf_counter() - start) * 1000.0 / runs
+
+
+def measure_preprocess_ms(projection, scaler, seq_len: int, runs: int = 200) -> float:
+    window = np.random.default_rng(0).random((seq_len, 63), dtype=np.float32)
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        scaler.transform(projection(wrist_relative(window)))
+    return (time.perf_counter() - start) * 1000.0 / runs
+
+
+def _load_study_data():
+    normalized_folder = resolve_normalized_folder(PROJECT_ROOT)
+    if not is_compact_folder(normalized_folder):
+        raise ValueError(f"{normalized_folder} is not in compact format. Re-run normalize_folder.")
+
+    frames, offsets, lengths, y = load_compact_dataset(normalized_folder)
+    frames = wrist_relative(frames)
+
+    # One split for every configuration so accuracies are comparable.
+    train_idx, test_idx = train_test_split(
+        np.arange(len(y)),
+        test_size=0.2,
+        random_state=42,
+        stratify=y
+    )
+    return frames, offsets, lengths, y, train_idx, test_idx
+
+
+def _train_study_config(name, data, seq_len: int, stride: int, feature_config, epochs: int, windowed: bool):
+    # windowed=True trains on the consecutive-frame windows live clients send
+    # (see window_gather_indices); otherwise each recording is resampled to
+    # seq_len as in main().
+    frames, offsets, lengths, y, train_idx, test_idx = data
+    num_classes = int(np.max(y)) + 1
+
+    models_folder = os.path.join(PROJECT_ROOT, "models")
+    config_folder = os.path.join(models_folder, "study", name)
+    os.makedirs(config_folder, exist_ok=True)
+    print(f"--- {name} ---")
+
+    span = (seq_len - 1) * stride + 1
+    hop = max(1, span // 2)
+    if windowed:
+        train_rows, train_owner = window_gather_indices(offsets, lengths, seq_len, stride, train_idx, hop)
+        test_rows, test_owner = window_gather_indices(offsets, lengths, seq_len, stride, test_idx, hop)
+        weights = np.bincount(train_rows.ravel(), minlength=len(frames))
+    else:
+        train_owner, test_owner = train_idx, test_idx
+        weights = expansion_counts(offsets, lengths, seq_len, len(frames), indices=train_idx)
+
+    projection = FeatureProjection(feature_config).fit(frames, sample_weight=weights)
+    projected = projection(frames)
+
+    scaler = StandardScaler()
+    scaler.fit(projected, sample_weight=weights)
+    scaled = scaler.transform(projected).astype(np.float32)
+
+    if windowed:
+        X_train, X_test = scaled[train_rows], scaled[test_rows]
+    else:
+        X_train = expand_compact(scaled, offsets, lengths, seq_len, indices=train_idx)
+        X_test = expand_compact(scaled, offsets, lengths, seq_len, indices=test_idx)
+    y_train, y_test = y[train_owner], y[test_owner]
+
+    model = build_asl_sequence_classifier(
+        num_classes=num_classes,
+        seq_len=seq_len,
+        features_per_frame=projection.output_dim
+    )
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=1e-3),
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"]
+    )
+    model.fit(
+        X_train, y_train,
+        validation_data=(X_test, y_test),
+        epochs=epochs,
+        batch_size=64,
+        verbose=2,
+        callbacks=[
+            tf.keras.callbacks.EarlyStopping(
+                monitor="val_accuracy",
+                patience=12,
+                restore_best_weights=True
+            ),
+            tf.keras.callbacks.ReduceLROnPlateau(
+                monitor="val_loss",
+                factor=0.5,
+                patience=4,
+                min_lr=1e-5
+            )
+        ]
+    )
+
+    _, acc = model.evaluate(X_test, y_test, verbose=0)
+    y_pred = np.argmax(model.predict(X_test, verbose=0), axis=1)
+    motion = np.isin(y_test, MOTION_LABELS)
+
+    model_path = os.path.join(config_folder, "asl_sequence_classifier.keras")
+    scaler_path = os.path.join(config_folder, "scaler.pkl")
+    model.save(model_path)
+    joblib.dump(scaler, scaler_path)
+
+    pca_path = None
+    if projection.config["pca_components"]:
+        pca_path = os.path.join(config_folder, "feature_pca.npz")
+        projection.save_pca(pca_path)
+        pca_path = os.path.relpath(pca_path, models_folder)
+
+    result = {
+        "name": name,
+        "seq_len": int(seq_len),
+        "frame_stride": int(stride),
+        # Recorded frames one input spans; None when whole recordings are resampled.
+        "window_frames": int(span) if windowed else None,
+        "sample_windows": {"hop": int(hop)} if windowed else None,
+        "test_windows": int(len(y_test)),
+        "payload_floats": int(seq_len * frames.shape[1]),
+        **projection.to_metadata(pca_path),
+        "test_accuracy": float(acc),
+        "motion_letter_accuracy": (
+            float(np.mean(y_pred[motion] == y_test[motion])) if motion.any() else None
+        ),
+        "params": int(model.count_params()),
+        "latency_ms": measure_latency_ms(model, seq_len, projection.output_dim),
+        "preprocess_ms": measure_preprocess_ms(projection, scaler, seq_len),
+        "model_path": os.path.relpath(model_path, models_folder),
+        "scaler_path": os.path.relpath(scaler_path, models_folder),
     }
+    print(json.dumps(result, indent=2))
+    return result
+
+
+def _write_study_results(results, filename: str):
+    results_path = os.path.join(PROJECT_ROOT, "models", "study", filename)
+    with open(results_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"study results -> {results_path}")
+
+
+def run_sequence_study(seq_lens, strides, epochs: int = 60):
+    tf.keras.utils.set_random_seed(42)
+    data = _load_study_data()
+
+    results = []
+    for seq_len in seq_lens:
+        for stride in strides:
+            name = f"seq{seq_len}_stride{stride}"
+            results.append(_train_study_config(name, data, seq_len, stride, None, epochs, windowed=True))
+
+    _write_study_results(results, "sequence_study.json")
+
+
+def run_feature_study(presets, seq_len: int = 30, epochs: int = 60):
+    tf.keras.utils.set_random_seed(42)
+    data = _load_study_data()
+
+    results = []
+    for preset in presets:
+        name = f"features_{preset}"
+        # Same sampling as main(), so presets compare against the full model.
+        results.append(_train_study_config(name, data, seq_len, 1, FEATURE_PRESETS[preset], epochs, windowed=False))
+
+    _write_study_results(results, "feature_study.json")
 
+
+def _serve_study_result(chosen):
+    models_folder = os.path.join(PROJECT_ROOT, "models")
     metadata_path = os.path.join(models_folder, "metadata.json")
+    with open(metadata_path, "r") as f:
+        metadata = json.load(f)
+
+    metadata.update({
+        "seq_len": chosen["seq_len"],
+        "frame_stride": chosen["frame_stride"],
+        "model_path": chosen["model_path"],
+        "scaler_path": chosen["scaler_path"],
+        "numpy_weights_path": os.path.splitext(chosen["model_path"])[0] + ".npz",
+        "feature_projection": chosen["feature_projection"],
+        "model_features": chosen["model_features"],
+    })
+    # How the model's training inputs were cut; incremental runs reuse it.
+    if chosen.get("sample_windows"):
+        metadata["sample_windows"] = chosen["sample_windows"]
+    else:
+        metadata.pop("sample_windows", None)
+    metadata.setdefault("lineage", []).append({
+        "mode": "study_config",
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "name": chosen["name"],
+        "test_accuracy": chosen["test_accuracy"],
+    })
+
     with open(metadata_path, "w") as f:
         json.dump(metadata, f, indent=2)
 
+    # numpy_weights_path now names this config's .npz, which the study never wrote.
+    export_numpy_model.main()
+
+
+def _load_study_results(filename: str):
+    results_path = os.path.join(PROJECT_ROOT, "models", "study", filename)
+    with open(results_path, "r") as f:
+        return results_path, json.load(f)
+
+
+def serve_study_config(seq_len: int, stride: int):
+    results_path, results = _load_study_results("sequence_study.json")
+    match = [r for r in results if r["seq_len"] == seq_len and r["frame_stride"] == stride]
+    if not match:
+        raise ValueError(f"No study result for seq_len={seq_len} stride={stride} in {results_path}")
+    _serve_study_result(match[0])
+
+
+def serve_feature_config(preset: str):
+    results_path, results = _load_study_results("feature_study.json")
+    match = [r for r in results if r["name"] == f"features_{preset}"]
+    if not match:
+        raise ValueError(f"No feature study result for {preset!r} in {results_path}")
+    _serve_study_result(match[0])
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="train directly on the compact normalized dataset, expanding batches on demand",
+    )
+    parser.add_argument("--seq-len", type=int, default=30)
+    parser.add_argument(
+        "--incremental",
+        metavar="NEW_DATA_FOLDER",
+        help="fine-tune the deployed model and scaler on raw .npy samples in this folder",
+    )
+    parser.add_argument(
+        "--replay-ratio",
+        type=float,
+        default=1.0,
+        help="old samples replayed per new sample during incremental fine-tuning",
+    )
+    parser.add_argument("--epochs", type=int, default=20, help="epochs for --incremental")
+    parser.add_argument("--learning-rate", type=float, default=1e-4, help="learning rate for --incremental")
+    parser.add_argument(
+        "--study",
+        action="store_true",
+        help="train and evaluate every --study-seq-lens x --study-strides combination",
+    )
+    parser.add_argument("--study-seq-lens", type=int, nargs="+", default=[10, 15, 20, 30])
+    parser.add_argument("--study-strides", type=int, nargs="+", default=[1, 2])
+    parser.add_argument(
+        "--serve-study-config",
+        type=int,
+        nargs=2,
+        metavar=("SEQ_LEN", "STRIDE"),
+        help="point metadata.json at a model trained by --study",
+    )
+    parser.add_argument(
+        "--features",
+        choices=sorted(FEATURE_PRESETS),
+        default="full",
+        help="feature projection applied after wrist-relative normalization",
+    )
+    parser.add_argument(
+        "--feature-study",
+        nargs="*",
+        choices=sorted(FEATURE_PRESETS),
+        help="train and compare these feature presets (all if none are given)",
+    )
+    parser.add_argument(
+        "--serve-feature-config",
+        choices=sorted(FEATURE_PRESETS),
+        help="point metadata.json at a model trained by --feature-study",
+    )
+    args = parser.parse_args()
+
+    if args.study:
+        run_sequence_study(args.study_seq_lens, args.study_strides)
+    elif args.serve_study_config:
+        serve_study_config(*args.serve_study_config)
+    elif args.feature_study is not None:
+        run_feature_study(args.feature_study or list(FEATURE_PRESETS), seq_len=args.seq_len)
+    elif args.serve_feature_config:
+        serve_feature_config(args.serve_feature_config)
+    elif args.incremental:
+        incremental_main(
+            args.incremental,
+            replay_ratio=args.replay_ratio,
+            epochs=args.epochs,
+            learning_rate=args.learning_rate,
+        )
+    else:
+        main(compact=args.compact, seq_len=args.seq_len, feature_config=FEATURE_PRESETS[args.features])